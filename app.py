@@ -1,5 +1,8 @@
+import sys
+
 import questionary
-from rich.console import Console
+from loguru import logger
+from rich.console import Console, Group
 from rich.panel import Panel
 
 from core.config_manager import ConfigManager
@@ -17,7 +20,8 @@ class ImpactRPA:
     """Impact RPA 主应用类（组合根）。"""
 
     def __init__(self):
-        self.console = Console()
+        # 输出内容均为程序内的可信字符串，关闭自动高亮省去每次 print 的正则扫描
+        self.console = Console(highlight=False)
         self.config = ConfigManager()
 
         # 初始化远程同步服务
@@ -41,13 +45,16 @@ class ImpactRPA:
         self.config_store.start_watching(interval_s=0.8)
         self.settings = SettingsService(self.config)
         self.template_manager = TemplateManager(self.config)
-        self.browser = BrowserManager(self.console, self.config)
+        # 远程配置已在上面拉取落盘，这里读取一次并共享给浏览器层和发送层
+        settings = self.config.load_settings()
+        self.browser = BrowserManager(self.console, self.config, settings=settings)
         self.proposal_sender = ProposalSender(
             self.browser,
             self.template_manager,
             self.console,
             self.config,
             config_store=self.config_store,
+            settings=settings,
         )
         self.menu = MenuUI(
             self.config,
@@ -57,17 +64,16 @@ class ImpactRPA:
             proposal_sender=self.proposal_sender,
         )
 
-    def start(self):
+    def start(self, connect_browser: bool = True):
+        """connect_browser=False 时跳过启动时的浏览器连接，仅管理模板/设置；
+        发送类菜单项在首次使用时再连接浏览器。"""
         try:
-            if not self.browser.init():
-                self.console.print("[red]无法连接浏览器，请确保浏览器已打开[/red]")
-                try:
-                    from notification_service import NotificationService, NotificationPayload
-                    NotificationService().send(NotificationPayload(message="无法连接浏览器"))
-                except Exception:
-                    pass
-                return
-            self._maybe_seed_partner_groups_once()
+            if connect_browser:
+                if not self.browser.init():
+                    self.console.print("[red]无法连接浏览器，请确保浏览器已打开[/red]")
+                    self._send_notification("无法连接浏览器")
+                    return
+                self._maybe_seed_partner_groups_once()
             self._main_loop()
         finally:
             try:
@@ -129,6 +135,15 @@ class ImpactRPA:
                 self.console.print("\n[bold cyan]感谢使用，再见！👋[/bold cyan]")
                 break
 
+    def _send_notification(self, message: str) -> None:
+        """桌面通知的唯一入口：按需导入（不把 pydantic/plyer 带进启动路径）。
+        通知在后台线程发送，失败只记日志；依赖缺失也不影响发送流程。"""
+        try:
+            from notification_service import notify
+            notify(message)
+        except Exception as e:
+            logger.warning(f"发送通知失败: {e}")
+
     def _notify_proposal_run(self, result: SendProposalsResult | None = None, error: Exception | None = None) -> None:
         if error is not None:
             msg = f"发送失败: {error}"
@@ -136,11 +151,7 @@ class ImpactRPA:
             msg = f"发送完成，共发送 {result.clicked_count} 个"
         else:
             return
-        try:
-            from notification_service import NotificationService, NotificationPayload
-            NotificationService().send(NotificationPayload(message=msg))
-        except Exception:
-            pass
+        self._send_notification(msg)
 
     def _start_send_proposals(self):
         if not self.browser.is_connected() and not self.browser.init():
@@ -162,18 +173,18 @@ class ImpactRPA:
             self.console.print("[red]起始序号需大于等于 1[/red]")
             return
 
-        self.console.print(
+        header = (
             f"\n[cyan]准备发送 [bold]{max_count}[/bold] 个 Send Proposal（从第 [bold]{start_index}[/bold] 个开始）[/cyan]"
         )
 
+        # 提示语与模板预览合并为一次输出
         template = self.template_manager.get_active_template()
         if not template:
-            self.console.print("[bold yellow]⚠️  警告: 留言模板为空！[/bold yellow]")
+            self.console.print(Group(header, "[bold yellow]⚠️  警告: 留言模板为空！[/bold yellow]"))
             if not questionary.confirm("是否继续?", default=False).ask():
                 return
         else:
-            self.console.print("\n[bold]当前留言模板预览:[/bold]")
-            self.console.print(Panel(template, border_style="dim"))
+            self.console.print(Group(header, "\n[bold]当前留言模板预览:[/bold]", Panel(template, border_style="dim")))
 
         if not questionary.confirm(
             f"确认从第 {start_index} 个开始发送 {max_count} 个 Proposal?",
@@ -232,16 +243,17 @@ class ImpactRPA:
             self.console.print("[red]行号需大于等于 1[/red]")
             return
 
+        header = f"\n[cyan]即将从第 {start_row} 行开始，发送 {max_count} 个 Proposal[/cyan]"
+
+        # 与 _start_send_proposals 相同：提示语与模板预览合并为一次输出
         template = self.template_manager.get_active_template()
         if not template:
-            self.console.print("[bold yellow]⚠️  警告: 留言模板为空！[/bold yellow]")
+            self.console.print(Group(header, "[bold yellow]⚠️  警告: 留言模板为空！[/bold yellow]"))
             if not questionary.confirm("是否继续?", default=False).ask():
                 return
         else:
-            self.console.print("\n[bold]当前留言模板预览:[/bold]")
-            self.console.print(Panel(template, border_style="dim"))
+            self.console.print(Group(header, "\n[bold]当前留言模板预览:[/bold]", Panel(template, border_style="dim")))
 
-        self.console.print(f"\n[cyan]即将从第 {start_row} 行开始，发送 {max_count} 个 Proposal[/cyan]")
         if not questionary.confirm("确认开始批量发送?", default=False).ask():
             self.console.print("[yellow]已取消[/yellow]")
             return
@@ -257,7 +269,7 @@ class ImpactRPA:
 
 def main() -> None:
     app = ImpactRPA()
-    app.start()
+    app.start(connect_browser="--no-browser" not in sys.argv[1:])
 
 
 if __name__ == "__main__":
@@ -1,7 +1,61 @@
+import copy
 import json
 import os
+import tempfile
+import threading
 from loguru import logger
 
+# 已注册的日志文件 sink，避免多次实例化 ConfigManager 时重复 add 导致每行日志写多遍
+_LOG_SINKS: set[str] = set()
+# 本进程内已确认存在的目录，重复实例化时不再逐个 makedirs
+_ENSURED_DIRS: set[str] = set()
+
+
+def ensure_dir(path: str) -> None:
+    """确保目录存在；同一路径在本进程内只检查一次。"""
+    if path in _ENSURED_DIRS:
+        return
+    os.makedirs(path, exist_ok=True)
+    _ENSURED_DIRS.add(path)
+
+
+def normalize_settings(merged: dict) -> dict:
+    """合并默认值后的一次性规整（每次文件变化只做一次），调用方读取时不必再各自 strip。"""
+    merged["template_term"] = (merged.get("template_term") or "").strip()
+    return merged
+
+
+def ensure_log_sink(sink: str, **add_kwargs) -> bool:
+    """为日志文件注册 loguru sink；同一路径在本进程内只注册一次，返回本次是否新注册。"""
+    if sink in _LOG_SINKS:
+        return False
+    _LOG_SINKS.add(sink)
+    logger.add(sink, **add_kwargs)
+    return True
+
+
+def write_json_atomic(path: str, data, **dump_kwargs) -> None:
+    """先写临时文件再 os.replace 覆盖，避免中途崩溃留下半截 JSON。
+
+    临时文件用 mkstemp 在同一目录下生成唯一文件名：配置监听、远程同步与界面保存可能同时写同一个文件，
+    固定的 .tmp 名会互相截断；fsync 后再替换，保证替换进来的是完整内容。
+    """
+    # 先整体序列化再一次写入；json.dump 会按片段多次调用 write
+    text = json.dumps(data, **dump_kwargs)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
 
 class ConfigManager:
     """配置管理类，负责处理所有配置文件的读写。"""
@@ -15,14 +69,23 @@ class ConfigManager:
         self.settings_file = os.path.join(self.config_dir, "settings.json")
         # 可选：由组合根注入，用于配置热更新
         self.store = None
+        # 进程内缓存：settings.json mtime 未变化时复用已合并的结果；
+        # 配置监听线程与主线程会同时读写，缓存的检查、填充与保存后的更新都在锁内完成
+        self._settings_cache: dict | None = None
+        self._settings_mtime: int | None = None
+        self._settings_lock = threading.Lock()
 
         self.default_settings = {
             "max_proposals": 10,
             "scroll_delay": 1.0,
             "click_delay": 0.5,
             "modal_wait": 20.0,
+            # 开发测试模式：不会真正点击 Send Proposal 按钮，仅模拟流程
             "dry_run": False,
+            # Proposal 弹窗内的 Template Term 下拉默认选择项
+            # 例如："Commission Tier Terms" / "Public Terms" / "Ulanzi Terms"
             "template_term": "Commission Tier Terms",
+            # 是否在 Proposal 弹窗内输入 Partner Groups 标签
             "input_partner_groups_tag": True,
             # 是否输出 Partner Groups 下拉解析与点击的详细调试日志
             "partner_groups_debug_logging": False,
@@ -42,48 +105,97 @@ class ConfigManager:
                 },
                 "id_by_name": {},
             },
+            # 发生异常时是否截图（页面+尽可能元素），截图保存在 logs/screenshots
             "screenshot_on_error": True,
+            # 是否整页截图（True=整页，False=仅可视区域；整页对浏览器内核版本有要求且更慢）
             "screenshot_full_page": False,
+            # 复用的浏览器调试地址（如 127.0.0.1:9222），留空则使用 DrissionPage 默认地址
+            "browser_address": "",
+            # 视觉 RPA 配置（兼容 OpenAI SDK 格式的 VL LLM）
             "vision_rpa": {
-                "enabled": False,
-                "api_key": "",
-                "base_url": "",
-                "model": "gpt-4o",
+                "enabled": False,  # 是否启用视觉 RPA
+                "api_key": "",  # API Key，也可通过环境变量 VL_API_KEY 设置
+                "base_url": "",  # API 地址，也可通过环境变量 VL_BASE_URL 设置
+                "model": "gpt-4o",  # 模型名称
                 "max_tokens": 1024,
                 "temperature": 0.1,
                 "timeout": 30,
-                "browser_ui_offset_x": 0,
-                "browser_ui_offset_y": 0,
+                # 浏览器 UI 偏移（标签栏+地址栏高度，单位：像素）
+                # Chrome/Edge 通常约为 100-150px，可根据实际情况调整
+                "browser_ui_offset_x": 0,  # 内容区域左侧偏移
+                "browser_ui_offset_y": 0,  # 内容区域顶部偏移（约 100-150px）
             },
         }
 
-        os.makedirs(self.config_dir, exist_ok=True)
-        os.makedirs(self.log_dir, exist_ok=True)
+        ensure_dir(self.config_dir)
+        ensure_dir(self.log_dir)
         self._setup_logger()
 
     def _setup_logger(self) -> None:
-        logger.add(
+        ensure_log_sink(
             os.path.join(self.log_dir, "impact_rpa_{time:YYYY-MM-DD}.log"),
             rotation="1 day",
             retention="7 days",
             level="INFO",
             format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}",
             encoding="utf-8",
+            # 写文件放到后台线程，发送循环里的日志调用不阻塞在磁盘 I/O 上
+            enqueue=True,
         )
 
-    def load_settings(self) -> dict:
+    def _settings_file_mtime(self) -> int | None:
         try:
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, "r", encoding="utf-8") as f:
-                    return {**self.default_settings, **json.load(f)}
-        except Exception as e:
-            logger.error(f"加载设置失败: {e}")
-        return self.default_settings.copy()
+            return os.stat(self.settings_file).st_mtime_ns
+        except OSError:
+            return None
+
+    def invalidate_settings_cache(self) -> None:
+        with self._settings_lock:
+            self._settings_cache = None
+            self._settings_mtime = None
+
+    def _load_cached(self) -> dict:
+        """返回缓存的合并结果本身（不拷贝），仅供只读查询使用。"""
+        with self._settings_lock:
+            mtime = self._settings_file_mtime()
+            if self._settings_cache is not None and mtime == self._settings_mtime:
+                return self._settings_cache
+            try:
+                # 直接打开读取（EAFP），缓存的 mtime 取自已打开文件的 fstat，与读到的内容严格对应
+                with open(self.settings_file, "rb") as f:
+                    mtime = os.fstat(f.fileno()).st_mtime_ns
+                    merged = normalize_settings({**self.default_settings, **json.loads(f.read())})
+                self._settings_cache = merged
+                self._settings_mtime = mtime
+                return merged
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.error(f"加载设置失败: {e}")
+            return self.default_settings
+
+    def load_settings(self) -> dict:
+        # 调用方会原地修改返回值后再保存，因此返回副本
+        return copy.deepcopy(self._load_cached())
+
+    def get_setting(self, key: str, default=None):
+        """读取单个设置项：直接查缓存，不为整份设置做深拷贝。"""
+        value = self._load_cached().get(key, default)
+        return copy.deepcopy(value) if isinstance(value, (dict, list)) else value
 
     def save_settings(self, settings: dict) -> bool:
         try:
-            with open(self.settings_file, "w", encoding="utf-8") as f:
-                json.dump(settings, f, indent=4)
+            with self._settings_lock:
+                # 内容与缓存一致且文件未被外部改动时跳过写盘
+                if (
+                    self._settings_cache is not None
+                    and self._settings_mtime == self._settings_file_mtime()
+                    and normalize_settings({**self.default_settings, **settings}) == self._settings_cache
+                ):
+                    return True
+                write_json_atomic(self.settings_file, settings, indent=4)
+                self._settings_cache = normalize_settings(copy.deepcopy({**self.default_settings, **settings}))
+                self._settings_mtime = self._settings_file_mtime()
             logger.info("设置保存成功")
             try:
                 if self.store is not None:
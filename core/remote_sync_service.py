@@ -1,9 +1,8 @@
-import json
 import os
 import threading
 import requests
 from loguru import logger
-from core.config_manager import ConfigManager
+from core.config_manager import ConfigManager, write_json_atomic
 
 class RemoteSyncService:
     """
@@ -33,14 +32,12 @@ class RemoteSyncService:
                 
                 # 更新 settings.json
                 if "settings" in configs and configs["settings"]:
-                    with open(config_manager.settings_file, "w", encoding="utf-8") as f:
-                        json.dump(configs["settings"], f, indent=4, ensure_ascii=False)
+                    write_json_atomic(config_manager.settings_file, configs["settings"], indent=4, ensure_ascii=False)
                     logger.info("已找回并应用云端设置")
 
                 # 更新 templates.json
                 if "templates_data" in configs and configs["templates_data"]:
-                    with open(config_manager.templates_file, "w", encoding="utf-8") as f:
-                        json.dump(configs["templates_data"], f, indent=4, ensure_ascii=False)
+                    write_json_atomic(config_manager.templates_file, configs["templates_data"], indent=4, ensure_ascii=False)
                     logger.info("已找回并应用云端模板")
             elif resp.status_code == 404:
                 logger.info("云端暂无此机器的备份记录")
@@ -1,7 +1,9 @@
+import copy
 import json
 import os
+import threading
 from loguru import logger
-from core.config_manager import ConfigManager
+from core.config_manager import ConfigManager, write_json_atomic
 
 
 class TemplateManager:
@@ -10,28 +12,89 @@ class TemplateManager:
     def __init__(self, config: ConfigManager):
         self.config = config
         self._default_data = {"templates": [], "active_template_id": None}
+        # 进程内缓存：模板文件 mtime 未变化时直接复用解析结果
+        self._cache: dict | None = None
+        self._cache_sig: tuple | None = None
+        # 与缓存同步构建的 id -> 模板索引，只读查询无需线性扫描和整体深拷贝
+        self._by_id: dict = {}
+        self._max_id: int = 0
+        # 配置监听与远程同步线程也会读写模板：缓存的检查、刷新与保存后的更新都在锁内完成；
+        # 刷新时整体替换 _by_id，锁外的只读查询拿到的始终是某一版完整索引
+        self._cache_lock = threading.Lock()
+
+    def _file_signature(self) -> tuple:
+        def _mtime(path: str) -> int | None:
+            try:
+                return os.stat(path).st_mtime_ns
+            except OSError:
+                return None
+
+        return (_mtime(self.config.templates_file), _mtime(self.config.template_file))
+
+    def invalidate_cache(self) -> None:
+        with self._cache_lock:
+            self._clear_cache()
+
+    def _clear_cache(self) -> None:
+        self._cache = None
+        self._cache_sig = None
+        self._by_id = {}
+        self._max_id = 0
+
+    def _set_cache(self, data: dict, sig: tuple) -> None:
+        self._cache = data
+        self._cache_sig = sig
+        templates = data.get("templates") or []
+        self._by_id = {tpl.get("id"): tpl for tpl in templates}
+        self._max_id = max((tpl.get("id", 0) for tpl in templates), default=0)
+
+    def _load_cached(self) -> dict:
+        """返回缓存本身（不拷贝），仅供只读查询使用。"""
+        with self._cache_lock:
+            sig = self._file_signature()
+            if self._cache is not None and sig == self._cache_sig:
+                return self._cache
+            return self._read_files(sig)
 
     def load_all(self) -> dict:
+        # 调用方会原地修改返回值（如 add_template），因此返回副本
+        return copy.deepcopy(self._load_cached())
+
+    def _read_files(self, sig: tuple) -> dict:
+        """读取模板文件并刷新缓存；调用方需持有 _cache_lock。"""
         try:
-            if os.path.exists(self.config.templates_file):
-                with open(self.config.templates_file, "r", encoding="utf-8") as f:
-                    return {**self._default_data, **json.load(f)}
-            elif os.path.exists(self.config.template_file):
+            data = None
+            if sig[0] is not None:
+                with open(self.config.templates_file, "rb") as f:
+                    # 签名取自已打开文件的 fstat，保证缓存签名与读到的内容对应
+                    sig = (os.fstat(f.fileno()).st_mtime_ns, sig[1])
+                    data = {**self._default_data, **json.loads(f.read())}
+            elif sig[1] is not None:
                 with open(self.config.template_file, "r", encoding="utf-8") as f:
                     content = f.read().strip()
                     if content:
-                        return {
+                        data = {
                             "templates": [{"id": 1, "name": "默认模板", "content": content}],
                             "active_template_id": 1,
                         }
+            if data is None:
+                data = copy.deepcopy(self._default_data)
+            self._set_cache(data, sig)
+            return data
         except Exception as e:
             logger.error(f"加载模板数据失败: {e}")
-        return self._default_data.copy()
+            self._clear_cache()
+        return copy.deepcopy(self._default_data)
 
     def save_all(self, data: dict) -> bool:
         try:
-            with open(self.config.templates_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=4, ensure_ascii=False)
+            with self._cache_lock:
+                # templates.json 已存在、未被外部改动且内容一致时跳过写盘
+                sig = self._file_signature()
+                if self._cache is not None and sig[0] is not None and sig == self._cache_sig and data == self._cache:
+                    return True
+                write_json_atomic(self.config.templates_file, data, indent=4, ensure_ascii=False)
+                self._set_cache(copy.deepcopy(data), self._file_signature())
             logger.info("模板数据保存成功")
             try:
                 if getattr(self.config, "store", None) is not None:
@@ -45,28 +108,28 @@ class TemplateManager:
 
     def get_active_template(self) -> str:
         try:
-            data = self.load_all()
-            active_id = data.get("active_template_id", 1)
-            for tpl in data.get("templates", []):
-                if tpl.get("id") == active_id:
-                    return tpl.get("content", "")
+            data = self._load_cached()
+            tpl = self._by_id.get(data.get("active_template_id", 1))
+            if tpl is not None:
+                return tpl.get("content", "")
             if data.get("templates"):
                 return data["templates"][0].get("content", "")
         except Exception as e:
             logger.error(f"加载模板失败: {e}")
         return ""
 
+    def get_template(self, template_id: int) -> dict | None:
+        self._load_cached()
+        tpl = self._by_id.get(template_id)
+        return copy.deepcopy(tpl) if tpl is not None else None
+
     def get_active_template_info(self) -> dict | None:
-        data = self.load_all()
-        active_id = data.get("active_template_id")
-        for tpl in data.get("templates", []):
-            if tpl.get("id") == active_id:
-                return tpl
-        return None
+        return self.get_template(self._load_cached().get("active_template_id"))
 
     def get_next_id(self, data: dict | None = None) -> int:
         if data is None:
-            data = self.load_all()
+            self._load_cached()
+            return self._max_id + 1
         if not data.get("templates"):
             return 1
         return max(tpl.get("id", 0) for tpl in data["templates"]) + 1
@@ -74,7 +137,8 @@ class TemplateManager:
     def add_template(self, name: str, content: str, activate: bool = True) -> bool:
         try:
             data = self.load_all()
-            new_id = self.get_next_id(data)
+            # data 是缓存的副本，直接用与缓存同步维护的最大 id，无需再扫描模板列表
+            new_id = self._max_id + 1
             data["templates"].append({"id": new_id, "name": name or f"模板 {new_id}", "content": content})
             if activate:
                 data["active_template_id"] = new_id
@@ -103,7 +167,11 @@ class TemplateManager:
             data = self.load_all()
             if len(data["templates"]) <= 1:
                 return False
-            data["templates"] = [t for t in data["templates"] if t.get("id") != template_id]
+            # id 唯一，命中后原地删除即可结束遍历
+            for idx, tpl in enumerate(data["templates"]):
+                if tpl.get("id") == template_id:
+                    del data["templates"][idx]
+                    break
             if template_id == data.get("active_template_id") and data["templates"]:
                 data["active_template_id"] = data["templates"][0].get("id")
             return self.save_all(data)
@@ -23,6 +23,7 @@ from typing import Any
 from loguru import logger
 
 PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*([a-zA-Z0-9_]+)\s*\}\}")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
 
 
 def _render_placeholders(value: Any, ctx: dict[str, str]) -> Any:
@@ -41,7 +42,7 @@ def _render_placeholders(value: Any, ctx: dict[str, str]) -> Any:
 
 
 def _normalize_tab_key(text: str) -> str:
-    return re.sub(r"\s+", "", text or "")
+    return _WHITESPACE_PATTERN.sub("", text or "")
 
 
 def _build_context(selected_tab: str, id_by_name: dict[str, str] | None) -> dict[str, str]:
@@ -1,5 +1,7 @@
 from loguru import logger
 
+from exception_handler import is_disconnect_error
+
 
 class ProposalModalService:
     """负责 Proposal 弹窗内的流程编排。"""
@@ -28,8 +30,7 @@ class ProposalModalService:
             self.sender._submit_proposal(iframe)
             return True
         except Exception as e:
-            error_msg = str(e).lower()
-            if "disconnect" in error_msg or "context" in error_msg or "target closed" in error_msg:
+            if is_disconnect_error(e):
                 logger.warning(f"处理弹窗时页面断开: {e}")
                 raise
             logger.error(f"处理弹窗失败: {e}")
@@ -3,15 +3,15 @@ from loguru import logger
 
 from legacy_main import ProposalSender as LegacyProposalSender, SendProposalsResult
 from domain.proposal_modal_service import ProposalModalService
-from domain.selectors import MODAL_IFRAME_SELECTOR
-from domain.wait_utils import wait_until
+from domain.selectors import MODAL_CONTENT_READY_JS, MODAL_IFRAME_APPEAR_JS, MODAL_IFRAME_SELECTOR
+from domain.wait_utils import wait_for_js, wait_until
 
 
 class ProposalSender(LegacyProposalSender):
     """在保留原行为的基础上，增加服务化边界与公开接口。"""
 
-    def __init__(self, browser, template_manager, console, config, config_store=None):
-        super().__init__(browser, template_manager, console, config)
+    def __init__(self, browser, template_manager, console, config, config_store=None, settings=None):
+        super().__init__(browser, template_manager, console, config, settings=settings)
         self.modal_service = ProposalModalService(self)
         self._config_store = config_store
 
@@ -19,17 +19,56 @@ class ProposalSender(LegacyProposalSender):
         """菜单层可调用的公开方法，替代跨层访问私有方法。"""
         return self._get_template_term_options(iframe)
 
+    def send_proposals(self, *args, **kwargs) -> SendProposalsResult:
+        try:
+            return super().send_proposals(*args, **kwargs)
+        finally:
+            # 文件日志走后台队列；批次结束时等队列写完，便于随后按日志统计当日发送数
+            logger.complete()
+
+    def send_proposals_creator_search(self, *args, **kwargs) -> SendProposalsResult:
+        try:
+            return super().send_proposals_creator_search(*args, **kwargs)
+        finally:
+            logger.complete()
+
     def _handle_proposal_modal(self, selected_tab: str | None = None, template_content: str = "") -> bool:
         return self.modal_service.handle_modal(selected_tab=selected_tab, template_content=template_content)
 
+    def _observe_modal_iframe(self, deadline: float):
+        """在页面内挂 MutationObserver 等 iframe 插入，出现后再取一次句柄。
+
+        每次 run_js 最多等 1 秒，便于在超时前重新检查截止时间；JS 执行失败时返回 False。
+        """
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return None
+            try:
+                appeared = self.browser.tab.run_js(MODAL_IFRAME_APPEAR_JS, int(min(remaining, 1.0) * 1000))
+            except Exception as e:
+                logger.debug(f"MutationObserver 等待弹窗失败，改用轮询: {e}")
+                return False
+            if appeared:
+                iframe = self.browser.find_element(MODAL_IFRAME_SELECTOR, timeout=0.5)
+                if iframe:
+                    return iframe
+
     def _wait_for_modal_iframe(self):
         start_time = time.time()
-        iframe = wait_until(
-            lambda: self.browser.find_element(MODAL_IFRAME_SELECTOR, timeout=0.5),
-            timeout=self.modal_wait_timeout,
-            interval=self.modal_poll_interval,
-        )
+        iframe = self._observe_modal_iframe(start_time + self.modal_wait_timeout)
+        if iframe is False:
+            # 页面上无法执行 JS 时退回逐次查找轮询
+            iframe = wait_until(
+                lambda: self.browser.find_element(MODAL_IFRAME_SELECTOR, timeout=0.5),
+                timeout=max(start_time + self.modal_wait_timeout - time.time(), 0.5),
+                interval=self.modal_poll_interval,
+            )
         if iframe:
+            # iframe 节点先于其内容挂载；等表单真正渲染后再返回，后续各步骤的 ele() 就不必各自超时重试
+            remaining = max(self.modal_wait_timeout - (time.time() - start_time), 0.5)
+            if not wait_for_js(iframe, MODAL_CONTENT_READY_JS, timeout=min(remaining, 5.0), interval=0.1):
+                logger.debug("弹窗 iframe 已出现，但内容挂载检测超时，继续后续流程")
             elapsed = time.time() - start_time
             if elapsed > 2.0:
                 logger.debug(f"弹窗 iframe 出现（等待了 {elapsed:.2f} 秒）")
@@ -2,6 +2,77 @@
 
 MODAL_IFRAME_SELECTOR = 'css:iframe[data-testid="uicl-modal-iframe-content"]'
 
+# 在弹窗 iframe 内求值：文档已解析且表单控件已渲染
+MODAL_CONTENT_READY_JS = (
+    "document.readyState !== 'loading' && document.body !== null"
+    " && document.querySelector('button, textarea, input') !== null"
+)
+
+# 在列表页执行：用 MutationObserver 等待弹窗 iframe 插入，出现即 resolve(true)，
+# 最多等待 arguments[0] 毫秒后 resolve(false)；一次 CDP 调用代替逐次 ele() 轮询
+MODAL_IFRAME_APPEAR_JS = """
+var ms = arguments[0];
+var sel = 'iframe[data-testid="uicl-modal-iframe-content"]';
+return new Promise(function(resolve) {
+    if (document.querySelector(sel)) { resolve(true); return; }
+    var timer = null;
+    var obs = new MutationObserver(function() {
+        if (document.querySelector(sel)) { obs.disconnect(); clearTimeout(timer); resolve(true); }
+    });
+    obs.observe(document.documentElement, {childList: true, subtree: true});
+    timer = setTimeout(function() { obs.disconnect(); resolve(false); }, ms);
+});
+"""
+
+# 在列表页求值：弹窗 iframe 已从 DOM 移除（弹窗已关闭）
+MODAL_CLOSED_JS = "document.querySelector('iframe[data-testid=\"uicl-modal-iframe-content\"]') === null"
+
+# 在弹窗 iframe 内求值：下拉浮层已全部收起（选中选项后下拉会关闭）
+DROPDOWN_CLOSED_JS = (
+    "!Array.from(document.querySelectorAll("
+    "'div[data-testid=\"uicl-dropdown\"], div.iui-dropdown, ul[role=\"listbox\"]'"
+    ")).some(function(e) { return e.offsetParent !== null; })"
+)
+
+# 列表页 Send Proposal 按钮：文本过滤在浏览器内由 XPath 完成
+SEND_PROPOSAL_BUTTON_XPATH = (
+    'xpath://button[@data-testid="uicl-button" and contains(normalize-space(.), "Send Proposal")]'
+)
+
+# 弹窗提交后的确认按钮：同样在浏览器内按文本过滤，只有命中的按钮会返回；
+# 不限定 uicl-button，文本直接写在 button 上或包在子节点里都能命中
+UNDERSTAND_BUTTON_XPATH = 'xpath://button[contains(normalize-space(.), "I understand")]'
+
+# Creator Search 行详情里的 Send Proposal 触发器：XPath 并集按文档顺序返回、无法表达优先级，
+# 因此拆成两条，先查 button，未命中再退回直接含该文本的非 button 元素
+SEND_PROPOSAL_TRIGGER_BUTTON_XPATH = 'xpath://button[contains(normalize-space(.), "Send Proposal")]'
+SEND_PROPOSAL_TRIGGER_TEXT_XPATH = (
+    'xpath://*[text()[contains(., "Send Proposal")] and not(ancestor-or-self::button)]'
+)
+
+# Template Term 下拉触发器：由唯一隐藏字段 insertionOrderId 向上至多 3 层找到 multiselect 容器，
+# 再取其中的触发按钮，整条路径在浏览器内一次求值
+TEMPLATE_TERM_TRIGGER_XPATH = (
+    'xpath://input[@name="insertionOrderId"]'
+    '/ancestor::*[position()<=3][@data-testid="uicl-multiselect-input"][1]'
+    '//button[@data-testid="uicl-multi-select-input-button"]'
+)
+# 从 Template Term 标签向上至多 5 层找到所属的 iui-form-section
+FORM_SECTION_ANCESTOR_XPATH = 'xpath:ancestor::*[position()<=5][contains(@class, "iui-form-section")][1]'
+# 表单分组内 select-input 字段对里的触发按钮（排除 standard-date-time-input 日期字段）
+SELECT_INPUT_TRIGGER_SELECTOR = (
+    'css:div[data-testid="uicl-field-label-pair"][class*="select-input"]'
+    ' button[data-testid="uicl-multi-select-input-button"]'
+)
+
+TAG_INPUT_SELECTOR = 'css:input[data-testid="uicl-tag-input-text-input"]'
+TAG_INPUT_DROPDOWN_SELECTOR = 'css:[data-testid="uicl-tag-input-dropdown"]'
+# 从 tag 输入框直接定位外层 tag-input 容器（代替逐级 parent()）
+TAG_INPUT_CONTAINER_XPATH = 'xpath:ancestor::*[@data-testid="uicl-tag-input"][1]'
+
+# 一次查询同时覆盖 uicl-textarea 与 name=comment 两种写法，避免两级查找的超时累加
+COMMENT_TEXTAREA_SELECTOR = 'css:textarea[data-testid="uicl-textarea"], textarea[name="comment"]'
+
 DATE_INPUT_SELECTORS = [
     'css:button[data-testid="uicl-date-input"]',
 ]
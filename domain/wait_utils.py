@@ -10,3 +10,14 @@ def wait_until(fetch_fn, timeout: float, interval: float = 0.2):
         time.sleep(interval)
     return None
 
+
+def wait_for_js(context, js_expr: str, timeout: float = 3.0, interval: float = 0.05) -> bool:
+    """在 tab/iframe 内轮询 JS 条件表达式，条件成立即返回，替代固定 sleep。"""
+
+    def _check():
+        try:
+            return bool(context.run_js(f"return ({js_expr});"))
+        except Exception:
+            return False
+
+    return bool(wait_until(_check, timeout=timeout, interval=interval))
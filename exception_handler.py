@@ -131,5 +131,15 @@ class ExceptionHandler:
         return exceptions
 
 
+# 页面断开 / 执行上下文丢失类异常在文本中的特征片段
+DISCONNECT_TOKENS = ('disconnect', 'context', 'target closed')
+
+
+def is_disconnect_error(exception: Exception, extra: tuple = ()) -> bool:
+    """按异常文本判断是否为页面断开类错误；extra 用于个别调用点追加的特征片段。"""
+    msg = str(exception).lower()
+    return any(token in msg for token in DISCONNECT_TOKENS + extra)
+
+
 # 全局异常处理器实例
 exception_handler = ExceptionHandler()
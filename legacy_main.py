@@ -4,73 +4,63 @@ import time
 import os
 import json
 import re
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from io import StringIO
 from datetime import date, datetime, timedelta
 from loguru import logger
 import questionary
-from rich.console import Console
+from rich.console import Console, Group
 from rich.panel import Panel
 from rich.table import Table
-import pyperclip
-from difflib import SequenceMatcher
-from exception_handler import exception_handler
-import inspect
+from rich.text import Text
+from exception_handler import exception_handler, is_disconnect_error
+from core.config_manager import ConfigManager as CoreConfigManager, ensure_dir, ensure_log_sink, write_json_atomic
+from core.template_manager import TemplateManager
+from domain.wait_utils import wait_for_js, wait_until
+from domain.selectors import (
+    COMMENT_TEXTAREA_SELECTOR,
+    DROPDOWN_CLOSED_JS,
+    FORM_SECTION_ANCESTOR_XPATH,
+    MODAL_CLOSED_JS,
+    MODAL_IFRAME_SELECTOR,
+    SELECT_INPUT_TRIGGER_SELECTOR,
+    SEND_PROPOSAL_BUTTON_XPATH,
+    SEND_PROPOSAL_TRIGGER_BUTTON_XPATH,
+    SEND_PROPOSAL_TRIGGER_TEXT_XPATH,
+    TAG_INPUT_CONTAINER_XPATH,
+    TAG_INPUT_DROPDOWN_SELECTOR,
+    TAG_INPUT_SELECTOR,
+    TEMPLATE_TERM_TRIGGER_XPATH,
+    UNDERSTAND_BUTTON_XPATH,
+)
+import sys
+
+
+# Partner Group 选项文本末尾的计数后缀，如 "Creators (12)"
+_TAG_COUNT_RE = re.compile(r'\s*\(\d+\)\s*$')
+_WHITESPACE_RE = re.compile(r'\s+')
+# 截图文件名中不允许出现的字符
+_UNSAFE_NAME_RE = re.compile(r'[^a-zA-Z0-9\-_.]+')
+# 日期触发器文本，如 "May 8, 2026"
+_DATE_TEXT_RE = re.compile(r'^(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{1,2},\s+\d{4}$')
+# 链接/iframe src 中的 Creator psi 参数
+_PSI_RE = re.compile(r'psi=([a-f0-9-]+)')
+# 发送数量输入校验：仅 ASCII 数字且大于 0（isdigit 会放行 "²" 这类 int() 无法解析的字符）
+_POSITIVE_INT_RE = re.compile(r'0*[1-9][0-9]*')
+
+
+def _norm_term(text: str) -> str:
+    """Template Term 比较用的归一化：折叠空白并转小写（保留 "(1)/(2)" 这类区分值）。"""
+    return _WHITESPACE_RE.sub(' ', text).strip().lower()
+
+
+class ConfigManager(CoreConfigManager):
+    """配置管理类：设置缓存、读写与加锁沿用 core.config_manager，这里只保留旧入口更详细的文件日志"""
 
-
-class ConfigManager:
-    """配置管理类，负责处理所有配置文件的读写"""
-    
-    def __init__(self, base_dir: str | None = None):
-        self.base_dir = base_dir or os.path.dirname(__file__)
-        self.config_dir = os.path.join(self.base_dir, 'config')
-        self.log_dir = os.path.join(self.base_dir, 'logs')
-        self.template_file = os.path.join(self.config_dir, 'template.txt')
-        self.templates_file = os.path.join(self.config_dir, 'templates.json')
-        self.settings_file = os.path.join(self.config_dir, 'settings.json')
-        
-        # 默认设置
-        self.default_settings = {
-            "max_proposals": 10,
-            "scroll_delay": 1.0,
-            "click_delay": 0.5,
-            "modal_wait": 20.0,
-            # 开发测试模式：不会真正点击 Send Proposal 按钮，仅模拟流程
-            "dry_run": False,
-            # Proposal 弹窗内的 Template Term 下拉默认选择项
-            # 例如："Commission Tier Terms" / "Public Terms" / "Ulanzi Terms"
-            "template_term": "Commission Tier Terms",
-            # 是否在 Proposal 弹窗内输入 Partner Groups 标签
-            "input_partner_groups_tag": True,
-            # 发生异常时是否截图（页面+尽可能元素），截图保存在 logs/screenshots
-            "screenshot_on_error": True,
-            # 是否整页截图（True=整页，False=仅可视区域；整页对浏览器内核版本有要求且更慢）
-            "screenshot_full_page": False,
-            # 视觉 RPA 配置（兼容 OpenAI SDK 格式的 VL LLM）
-            "vision_rpa": {
-                "enabled": False,  # 是否启用视觉 RPA
-                "api_key": "",  # API Key，也可通过环境变量 VL_API_KEY 设置
-                "base_url": "",  # API 地址，也可通过环境变量 VL_BASE_URL 设置
-                "model": "gpt-4o",  # 模型名称
-                "max_tokens": 1024,
-                "temperature": 0.1,
-                "timeout": 30,
-                # 浏览器 UI 偏移（标签栏+地址栏高度，单位：像素）
-                # Chrome/Edge 通常约为 100-150px，可根据实际情况调整
-                "browser_ui_offset_x": 0,  # 内容区域左侧偏移
-                "browser_ui_offset_y": 0,  # 内容区域顶部偏移（约 100-150px）
-            },
-        }
-        
-        # 确保目录存在
-        os.makedirs(self.config_dir, exist_ok=True)
-        os.makedirs(self.log_dir, exist_ok=True)
-        
-        # 配置日志
-        self._setup_logger()
-    
     def _setup_logger(self):
-        """配置日志"""
-        logger.add(
+        """配置日志（DEBUG 级别，记录调用位置）；同一日志文件只注册一次 sink"""
+        ensure_log_sink(
             os.path.join(self.log_dir, 'impact_rpa_{time:YYYY-MM-DD}.log'),
             rotation='1 day',
             retention='7 days',
@@ -79,163 +69,14 @@ class ConfigManager:
             backtrace=True,
             diagnose=True,
             encoding='utf-8',
+            enqueue=True,
         )
-    
-    def load_settings(self) -> dict:
-        """加载设置"""
-        try:
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r', encoding='utf-8') as f:
-                    return {**self.default_settings, **json.load(f)}
-        except Exception as e:
-            logger.error(f"加载设置失败: {e}")
-        return self.default_settings.copy()
-    
-    def save_settings(self, settings: dict) -> bool:
-        """保存设置"""
-        try:
-            with open(self.settings_file, 'w', encoding='utf-8') as f:
-                json.dump(settings, f, indent=4)
-            logger.info("设置保存成功")
-            return True
-        except Exception as e:
-            logger.error(f"保存设置失败: {e}")
-            return False
-
-
-class TemplateManager:
-    """模板管理类，负责处理留言模板的CRUD操作"""
-    
-    def __init__(self, config: ConfigManager):
-        self.config = config
-        self._default_data = {"templates": [], "active_template_id": None}
-    
-    def load_all(self) -> dict:
-        """加载所有模板数据"""
-        try:
-            if os.path.exists(self.config.templates_file):
-                with open(self.config.templates_file, 'r', encoding='utf-8') as f:
-                    return {**self._default_data, **json.load(f)}
-            # 兼容旧的单模板文件
-            elif os.path.exists(self.config.template_file):
-                with open(self.config.template_file, 'r', encoding='utf-8') as f:
-                    content = f.read().strip()
-                    if content:
-                        return {
-                            "templates": [{"id": 1, "name": "默认模板", "content": content}],
-                            "active_template_id": 1
-                        }
-        except Exception as e:
-            logger.error(f"加载模板数据失败: {e}")
-        return self._default_data.copy()
-    
-    def save_all(self, data: dict) -> bool:
-        """保存所有模板数据"""
-        try:
-            with open(self.config.templates_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4, ensure_ascii=False)
-            logger.info("模板数据保存成功")
-            return True
-        except Exception as e:
-            logger.error(f"保存模板数据失败: {e}")
-            return False
-    
-    def get_active_template(self) -> str:
-        """获取当前激活的模板内容"""
-        try:
-            data = self.load_all()
-            active_id = data.get('active_template_id', 1)
-            for tpl in data.get('templates', []):
-                if tpl.get('id') == active_id:
-                    return tpl.get('content', '')
-            # 如果没找到激活的模板，返回第一个
-            if data.get('templates'):
-                return data['templates'][0].get('content', '')
-        except Exception as e:
-            logger.error(f"加载模板失败: {e}")
-        return ""
-    
-    def get_active_template_info(self) -> dict | None:
-        """获取当前激活的模板完整信息"""
-        data = self.load_all()
-        active_id = data.get('active_template_id')
-        for tpl in data.get('templates', []):
-            if tpl.get('id') == active_id:
-                return tpl
-        return None
-    
-    def get_next_id(self, data: dict | None = None) -> int:
-        """获取下一个可用的模板ID"""
-        if data is None:
-            data = self.load_all()
-        if not data.get('templates'):
-            return 1
-        max_id = max(tpl.get('id', 0) for tpl in data['templates'])
-        return max_id + 1
-    
-    def add_template(self, name: str, content: str, activate: bool = True) -> bool:
-        """添加新模板"""
-        try:
-            data = self.load_all()
-            new_id = self.get_next_id(data)
-            data['templates'].append({
-                "id": new_id,
-                "name": name or f"模板 {new_id}",
-                "content": content
-            })
-            if activate:
-                data['active_template_id'] = new_id
-            return self.save_all(data)
-        except Exception as e:
-            logger.error(f"添加模板失败: {e}")
-            return False
-    
-    def update_template(self, template_id: int, name: str | None = None, content: str | None = None) -> bool:
-        """更新模板"""
-        try:
-            data = self.load_all()
-            for tpl in data['templates']:
-                if tpl.get('id') == template_id:
-                    if name is not None:
-                        tpl['name'] = name
-                    if content is not None:
-                        tpl['content'] = content
-                    return self.save_all(data)
-            return False
-        except Exception as e:
-            logger.error(f"更新模板失败: {e}")
-            return False
-    
-    def delete_template(self, template_id: int) -> bool:
-        """删除模板"""
-        try:
-            data = self.load_all()
-            if len(data['templates']) <= 1:
-                return False
-            data['templates'] = [t for t in data['templates'] if t.get('id') != template_id]
-            # 如果删除的是激活的模板，切换到第一个
-            if template_id == data.get('active_template_id') and data['templates']:
-                data['active_template_id'] = data['templates'][0].get('id')
-            return self.save_all(data)
-        except Exception as e:
-            logger.error(f"删除模板失败: {e}")
-            return False
-    
-    def set_active(self, template_id: int) -> bool:
-        """设置激活的模板"""
-        try:
-            data = self.load_all()
-            data['active_template_id'] = template_id
-            return self.save_all(data)
-        except Exception as e:
-            logger.error(f"设置激活模板失败: {e}")
-            return False
 
 
 class BrowserManager:
     """浏览器管理类，负责浏览器连接和元素操作"""
     
-    def __init__(self, console: Console, config: ConfigManager | None = None):
+    def __init__(self, console: Console, config: ConfigManager | None = None, settings: dict | None = None):
         self.browser = None
         self.tab = None
         self.console = console
@@ -249,33 +90,44 @@ class BrowserManager:
             base_dir = None
         self.base_dir = base_dir or os.path.dirname(__file__)
 
-        settings = {}
-        try:
-            if config:
-                settings = config.load_settings() or {}
-        except Exception:
-            settings = {}
+        def _setting(key: str, default=None):
+            # 调用方已加载好的 settings 直接复用；否则只取三个标量设置项，走 get_setting 避免整份设置深拷贝
+            if settings is not None:
+                return settings.get(key, default)
+            try:
+                return config.get_setting(key, default) if config else default
+            except Exception:
+                return default
 
-        self.screenshot_on_error = bool(settings.get('screenshot_on_error', True))
-        self.screenshot_full_page = bool(settings.get('screenshot_full_page', False))
+        self.screenshot_on_error = bool(_setting('screenshot_on_error', True))
+        self.screenshot_full_page = bool(_setting('screenshot_full_page', False))
+        self.browser_address = str(_setting('browser_address') or '').strip()
         self.screenshot_dir = os.path.join(self.base_dir, 'logs', 'screenshots')
-        os.makedirs(self.screenshot_dir, exist_ok=True)
+        ensure_dir(self.screenshot_dir)
         self._last_screenshot_ts = 0.0
         self._screenshot_min_interval = 1.5
+        # 截图落盘的后台线程按需创建；未完成的写入超过上限时丢弃新截图
+        self._screenshot_writer: ThreadPoolExecutor | None = None
+        self._pending_screenshots: list = []
+        self._max_pending_screenshots = 8
+        # 页面断开类错误计数，重连成功后清零
+        self._disconnect_errors = 0
+        self._disconnect_report_every = 10
     
     def init(self) -> bool:
         """初始化或重新连接浏览器"""
         try:
             # 尝试多种方式连接浏览器
-            # 方式1: 默认连接（自动查找浏览器）
+            # 方式1: 默认连接（自动查找浏览器；配置了 browser_address 时直接挂到该调试端口）
             try:
-                self.browser = Chromium()
+                self.browser = self._connect_chromium()
                 try:
                     impact_tab = self.browser.get_tab(url='https://app.impact.com/secure/')
                 except Exception:
                     impact_tab = None
                 self.tab = impact_tab or self.browser.latest_tab
                 if self.tab:
+                    self._prepare_tab()
                     logger.info("浏览器连接成功（默认方式）")
                     return True
             except Exception as e1:
@@ -287,6 +139,7 @@ class BrowserManager:
                 self.browser = Chromium()
                 self.tab = self.browser.latest_tab
                 if self.tab:
+                    self._prepare_tab()
                     logger.info("浏览器连接成功（连接现有浏览器）")
                     return True
             except Exception as e2:
@@ -300,6 +153,7 @@ class BrowserManager:
                 self.browser = Chromium(addr_or_opts=options)
                 self.tab = self.browser.latest_tab
                 if self.tab:
+                    self._prepare_tab()
                     logger.info("浏览器连接成功（通过选项）")
                     return True
             except Exception as e3:
@@ -322,6 +176,22 @@ class BrowserManager:
             logger.debug(traceback.format_exc())
             return False
     
+    def _connect_chromium(self):
+        """连接浏览器：优先挂到配置的调试地址上，复用已启动的浏览器，避免每次运行冷启动。"""
+        if self.browser_address:
+            return Chromium(addr_or_opts=self.browser_address)
+        return Chromium()
+
+    def _prepare_tab(self) -> None:
+        """连接后对标签页做一次性设置：eager 加载模式（DOM 可交互即返回，不等图片/字体等子资源）。
+
+        说明：连接的是用户已登录的浏览器会话，因此不拦截 CSS/图片等资源，避免影响页面展示。
+        """
+        try:
+            self.tab.set.load_mode.eager()
+        except Exception as e:
+            logger.debug(f"设置 eager 加载模式失败: {e}")
+
     def reconnect(self) -> bool:
         """重新连接浏览器"""
         self.console.print("[yellow]检测到页面断开，正在重新连接...[/yellow]")
@@ -329,12 +199,17 @@ class BrowserManager:
         
         for i in range(self.max_retries):
             try:
-                self.browser = Chromium()
+                # 首次尝试优先复用现有的浏览器连接，仅重新获取标签页；失效时再新建连接
+                if i > 0 or self.browser is None:
+                    self.browser = self._connect_chromium()
                 try:
                     impact_tab = self.browser.get_tab(url='https://app.impact.com/secure/')
                 except Exception:
                     impact_tab = None
                 self.tab = impact_tab or self.browser.latest_tab
+                _ = self.tab.url
+                self._prepare_tab()
+                self._disconnect_errors = 0
                 self.console.print("[green]✓ 浏览器重新连接成功[/green]")
                 logger.info("浏览器重新连接成功")
                 return True
@@ -371,6 +246,13 @@ class BrowserManager:
         ctx = {}
         try:
             if self.tab:
+                # 优先一次 JS 同时取 url 与 title；失败再逐项读取
+                try:
+                    info = self.tab.run_js('return {url: location.href, title: document.title};')
+                    if isinstance(info, dict):
+                        return info
+                except Exception:
+                    pass
                 try:
                     ctx["url"] = self.tab.url
                 except Exception:
@@ -384,10 +266,32 @@ class BrowserManager:
             pass
         return ctx
 
+    _ELE_BRIEF_ATTRS = ("id", "class", "data-testid", "data-pa-testid", "role", "name")
+
+    # 一次调用读出标签名、关键属性与截断后的文本
+    _ELE_BRIEF_JS = """
+    var info = {tag: this.tagName ? this.tagName.toLowerCase() : null};
+    arguments[0].forEach(function (k) { var v = this.getAttribute(k); if (v) { info[k] = v; } }, this);
+    var t = (this.innerText || this.textContent || '').trim();
+    if (t) { info.text = t.slice(0, 200); }
+    return info;
+    """
+
     def _ele_brief(self, ele) -> dict | None:
         """提取元素的关键信息，避免日志过大。"""
         if not ele:
             return None
+        # 优先一次 JS 取全；元素已失效等情况下退回逐项读取
+        try:
+            info = ele.run_js(self._ELE_BRIEF_JS, list(self._ELE_BRIEF_ATTRS))
+            if isinstance(info, dict):
+                return info or None
+        except (PageDisconnectedError, ContextLostError):
+            # 页面已断开时逐项读取同样会全部失败，直接放弃
+            return None
+        except Exception:
+            pass
+
         info = {}
         try:
             info["tag"] = getattr(ele, "tag", None)
@@ -400,7 +304,7 @@ class BrowserManager:
             except Exception:
                 return None
 
-        for k in ("id", "class", "data-testid", "data-pa-testid", "role", "name"):
+        for k in self._ELE_BRIEF_ATTRS:
             v = _attr(k)
             if v:
                 info[k] = v
@@ -415,14 +319,12 @@ class BrowserManager:
     def _caller_brief(self) -> dict | None:
         """返回调用 BrowserManager 方法的业务函数位置，便于快速定位。"""
         try:
-            stack = inspect.stack()
-            # [0] 当前方法，[1] BrowserManager 内部调用者，[2] 通常是业务层
-            if len(stack) > 2:
-                frame = stack[2]
-                return {"file": frame.filename, "line": frame.lineno, "function": frame.function}
+            # [0] 当前方法，[1] BrowserManager 内部调用者，[2] 通常是业务层。
+            # sys._getframe 直接取栈帧，不像 inspect.stack() 那样遍历整条调用链并读取源码行
+            frame = sys._getframe(2)
+            return {"file": frame.f_code.co_filename, "line": frame.f_lineno, "function": frame.f_code.co_name}
         except Exception:
             return None
-        return None
 
     def _capture_screenshot(self, reason: str, element=None) -> dict | None:
         """按 DrissionPage 文档调用 get_screenshot() 保存截图，并返回路径信息。"""
@@ -434,35 +336,62 @@ class BrowserManager:
         if now - self._last_screenshot_ts < self._screenshot_min_interval:
             return None
         self._last_screenshot_ts = now
-
-        def _safe_name(s: str) -> str:
-            s = (s or 'error').strip()
-            s = re.sub(r'[^a-zA-Z0-9\-_.]+', '_', s)
-            return s[:80] if len(s) > 80 else s
+        # 错误风暴时写盘积压过多，直接丢弃本次截图，连抓取也省掉
+        self._pending_screenshots = [f for f in self._pending_screenshots if not f.done()]
+        if len(self._pending_screenshots) >= self._max_pending_screenshots:
+            return {"reason": reason, "dropped": True}
 
         stamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
-        tag = _safe_name(reason)
+        tag = _UNSAFE_NAME_RE.sub('_', (reason or 'error').strip())[:80]
         info = {"reason": reason}
+        # 截图需在出错当下同步抓取；编码后的字节交给后台线程落盘，发送循环不等磁盘写入
         try:
-            page_name = f"page_{stamp}_{tag}.jpg"
-            page_path = self.tab.get_screenshot(
-                path=self.screenshot_dir,
-                name=page_name,
-                full_page=self.screenshot_full_page,
-            )
+            page_path = os.path.join(self.screenshot_dir, f"page_{stamp}_{tag}.jpg")
+            data = self.tab.get_screenshot(as_bytes='jpg', full_page=self.screenshot_full_page)
+            self._write_screenshot_async(page_path, data)
             info["page"] = page_path
         except Exception as e:
             info["page_error"] = str(e)
 
         if element:
             try:
-                ele_name = f"ele_{stamp}_{tag}.jpg"
-                ele_path = element.get_screenshot(path=self.screenshot_dir, name=ele_name)
+                ele_path = os.path.join(self.screenshot_dir, f"ele_{stamp}_{tag}.jpg")
+                data = element.get_screenshot(as_bytes='jpg')
+                self._write_screenshot_async(ele_path, data)
                 info["element"] = ele_path
             except Exception as e:
                 info["element_error"] = str(e)
         return info
+
+    def _write_screenshot_async(self, path: str, data: bytes) -> None:
+        """提交到单线程写盘队列，由后台线程按提交顺序落盘。"""
+        if self._screenshot_writer is None:
+            self._screenshot_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ScreenshotWriter")
+
+        def _write():
+            try:
+                with open(path, 'wb') as f:
+                    f.write(data)
+            except Exception as e:
+                logger.debug(f"截图写入失败 {path}: {e}")
+
+        self._pending_screenshots.append(self._screenshot_writer.submit(_write))
     
+    def _suppress_disconnect_report(self, e: Exception, disconnected: bool = False) -> bool:
+        """页面断开类错误（切换标签页等）成串出现时，只完整上报第 1 次及此后每第 N 次。
+
+        返回 True 表示本次无需截图和写异常日志。
+        """
+        if not (disconnected or isinstance(e, (PageDisconnectedError, ContextLostError))):
+            return False
+        self._disconnect_errors += 1
+        n = self._disconnect_errors
+        if n == 1 or n % self._disconnect_report_every == 0:
+            if n > 1:
+                logger.warning(f"页面断开类错误累计 {n} 次（仅每 {self._disconnect_report_every} 次完整记录一次）")
+            return False
+        return True
+
     def find_element(self, locator: str, timeout: float = 3.0, parent=None):
         """安全地查找元素"""
         target = parent if parent else self.tab
@@ -471,6 +400,8 @@ class BrowserManager:
             return element
         except (ElementNotFoundError, PageDisconnectedError, ContextLostError) as e:
             logger.warning(f"查找元素失败: {e}")
+            if self._suppress_disconnect_report(e):
+                return None
             shot = self._capture_screenshot(f"find_element_{locator}")
             exception_handler.log_exception(
                 e,
@@ -486,9 +417,10 @@ class BrowserManager:
             )
             return None
         except Exception as e:
-            error_msg = str(e).lower()
-            if 'disconnect' in error_msg or 'context' in error_msg or 'target closed' in error_msg:
+            if is_disconnect_error(e):
                 logger.warning(f"页面可能已断开: {e}")
+                if self._suppress_disconnect_report(e, disconnected=True):
+                    return None
                 shot = self._capture_screenshot(f"find_element_disconnect_{locator}")
                 exception_handler.log_exception(
                     e,
@@ -514,6 +446,8 @@ class BrowserManager:
             return elements if elements else []
         except (ElementNotFoundError, PageDisconnectedError, ContextLostError) as e:
             logger.warning(f"查找元素失败: {e}")
+            if self._suppress_disconnect_report(e):
+                return []
             shot = self._capture_screenshot(f"find_elements_{locator}")
             exception_handler.log_exception(
                 e,
@@ -529,9 +463,10 @@ class BrowserManager:
             )
             return []
         except Exception as e:
-            error_msg = str(e).lower()
-            if 'disconnect' in error_msg or 'context' in error_msg or 'target closed' in error_msg:
+            if is_disconnect_error(e):
                 logger.warning(f"页面可能已断开: {e}")
+                if self._suppress_disconnect_report(e, disconnected=True):
+                    return []
                 shot = self._capture_screenshot(f"find_elements_disconnect_{locator}")
                 exception_handler.log_exception(
                     e,
@@ -587,7 +522,7 @@ class BrowserManager:
         """等待页面就绪"""
         try:
             self.tab.wait.doc_loaded(timeout=timeout)
-            time.sleep(0.5)
+            wait_for_js(self.tab, 'document.readyState !== "loading"', timeout=2.0)
             return True
         except Exception as e:
             logger.warning(f"等待页面就绪失败: {e}")
@@ -892,9 +827,17 @@ class BrowserManager:
             logger.warning(f"获取滚动容器信息失败: {e}")
             return {}
     
-    def navigate(self, url: str) -> bool:
-        """导航到指定URL"""
+    def navigate(self, url: str, reload: bool = True) -> bool:
+        """导航到指定URL
+
+        默认总是重新加载，保证页面状态与按钮标记都是新的；
+        reload=False 时若已停留在目标页则跳过加载，仅用于首次打开页面。
+        """
         try:
+            if not reload and (self.tab.url or '').rstrip('/') == url.rstrip('/'):
+                logger.debug(f"当前已在目标页面，跳过导航: {url}")
+                # 页面早已加载，一次 readyState 检查即可，无需再走完整的加载等待
+                return wait_for_js(self.tab, 'document.readyState !== "loading"', timeout=2.0)
             self.tab.get(url)
             return self.wait_for_page_ready()
         except Exception as e:
@@ -1105,6 +1048,52 @@ class DatePicker:
         except Exception:
             return False
 
+    # 日期格子 selector 含 [class*="day"]/[class*="date"] 子串匹配，全文档扫描既慢又会命中表单里的日期字段；
+    # 先从月份翻页按钮向上找到最近的包含格子的祖先作为日历根，只在其内查询，找不到才退回整个文档
+    _CALENDAR_CELLS_JS = """
+        function calendarCells(sel) {
+            var nav = document.querySelector(
+                'button[data-testid="uicl-calendar-next-month"], button[data-testid="uicl-calendar-previous-month"]');
+            for (var el = nav ? nav.parentElement : null; el; el = el.parentElement) {
+                if (el.querySelector('td, [role="gridcell"]')) { return el.querySelectorAll(sel); }
+            }
+            return document.querySelectorAll(sel);
+        }
+    """
+
+    # 在浏览器内一次性完成“查找目标日期格子并点击”，避免逐个读取 cell.text 的往返。
+    # 优先按属性中的完整 ISO 日期精确命中，找不到再按格子文本等于目标日匹配
+    _PICK_DAY_BY_TEXT_JS = _CALENDAR_CELLS_JS + """
+        var sel = arguments[0], day = arguments[1], iso = arguments[2] || '';
+        var cells = calendarCells(sel);
+        function enabled(c) {
+            return c.getAttribute('aria-disabled') !== 'true' && !c.classList.contains('disabled')
+                && !c.hasAttribute('disabled');
+        }
+        if (iso) {
+            var names = ['data-date', 'aria-label', 'title'];
+            for (var i = 0; i < cells.length; i++) {
+                var c = cells[i];
+                if (!enabled(c)) continue;
+                for (var j = 0; j < names.length; j++) {
+                    var v = c.getAttribute(names[j]) || '';
+                    if (v.indexOf(iso) !== -1 || v.indexOf(iso.replace(/-/g, '/')) !== -1) {
+                        c.click();
+                        return true;
+                    }
+                }
+            }
+        }
+        for (var k = 0; k < cells.length; k++) {
+            var d = cells[k];
+            if ((d.innerText || d.textContent || '').trim() !== day) continue;
+            if (!enabled(d)) continue;
+            d.click();
+            return true;
+        }
+        return false;
+    """
+
     def _try_pick_date_in_view_fast_impact(
         self,
         context,
@@ -1113,31 +1102,48 @@ class DatePicker:
     ) -> bool:
         """Impact 专用快速路径：按日期文本直接点击"""
         try:
-            cells = context.eles('css:td, .day, [class*="day"], [class*="date"]')
+            clicked = context.run_js(
+                self._PICK_DAY_BY_TEXT_JS,
+                'td, [role="gridcell"], .day, [class*="day"], [class*="date"]',
+                target_day,
+                target_iso,
+            )
+        except Exception as e:
+            logger.debug(f"JS 快速选择日期失败，回退逐个匹配: {e}")
+            return self._try_pick_date_in_view_fast_impact_by_elements(context, target_day, target_iso)
+
+        if clicked:
+            logger.info(f"已通过快速路径选择日期: {target_iso}")
+            # 日历弹层收起即视为选择已生效，最多等待原先的 0.2s
+            wait_for_js(context, self._CALENDAR_CLOSED_JS, timeout=0.2)
+            return True
+        return False
+
+    def _try_pick_date_in_view_fast_impact_by_elements(
+        self,
+        context,
+        target_day: str,
+        target_iso: str,
+    ) -> bool:
+        """快速路径的兜底：JS 不可用时用一次 XPath 在浏览器内按文本筛出目标格子，不再逐个读取格子文本。"""
+        try:
+            cell = context.ele(self._DATE_CELL_BY_TEXT_XPATH.format(day=target_day), timeout=0)
         except Exception:
             return False
 
-        if not cells:
+        if not cell:
             return False
 
-        for cell in cells or []:
+        try:
+            cell.click(by_js=True)
+        except Exception:
             try:
-                if (cell.text or '').strip() != target_day:
-                    continue
-                try:
-                    cell.click(by_js=True)
-                except Exception:
-                    try:
-                        cell.click()
-                    except Exception:
-                        continue
-                logger.info(f"已通过快速路径选择日期: {target_iso}")
-                time.sleep(0.2)
-                return True
+                cell.click()
             except Exception:
-                continue
-
-        return False
+                return False
+        logger.info(f"已通过快速路径选择日期: {target_iso}")
+        wait_for_js(context, self._CALENDAR_CLOSED_JS, timeout=0.2)
+        return True
 
     def _open_date_picker(self, context) -> bool:
         """打开日期选择器"""
@@ -1154,7 +1160,8 @@ class DatePicker:
                     except Exception:
                         btn.click(by_js=None)
                     logger.info("已打开日期选择器")
-                    time.sleep(0.25)
+                    # 日历弹层出现（月份切换按钮可见）即可继续，不再固定等待
+                    wait_for_js(context, self._CALENDAR_OPEN_JS, timeout=0.5)
                     return True
             except Exception:
                 pass
@@ -1224,6 +1231,17 @@ class DatePicker:
         logger.warning("未找到日期选择器按钮")
         return False
     
+    _CALENDAR_OPEN_JS = (
+        "document.querySelector('button[data-testid=\"uicl-calendar-next-month\"], "
+        "button[data-testid=\"uicl-calendar-previous-month\"]') !== null"
+    )
+    _CALENDAR_CLOSED_JS = f"!({_CALENDAR_OPEN_JS})"
+    # 与 DATE_CELL_SELECTORS 覆盖相同的格子，文本等于目标日（day 为纯数字）
+    _DATE_CELL_BY_TEXT_XPATH = (
+        'xpath://td[normalize-space(.)="{day}"]'
+        ' | //*[contains(@class, "day") or contains(@class, "date")][normalize-space(.)="{day}"]'
+    )
+
     # Impact 平台专用：日期按钮显示格式中的月份缩写
     IMPACT_DATE_BUTTON_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
     
@@ -1264,6 +1282,57 @@ class DatePicker:
         
         return False
     
+    # 在浏览器内一次性完成日期格子的禁用判断与匹配（与 _is_disabled 规则一致），
+    # 命中后仅给目标格子打标记，再由 Python 侧用原有方式真实点击
+    _MARK_DATE_CELL_JS = _CALENDAR_CELLS_JS + """
+        var sel = arguments[0], day = arguments[1], iso = arguments[2], isoSlash = arguments[3];
+        var keywords = arguments[4], attrOnly = arguments[5], mark = arguments[6];
+        function isDisabled(c) {
+            if ((c.getAttribute('aria-disabled') || '').trim().toLowerCase() === 'true') return true;
+            var cls = (c.getAttribute('class') || '').toLowerCase();
+            for (var i = 0; i < keywords.length; i++) {
+                if (cls.indexOf(keywords[i]) !== -1) return true;
+            }
+            if ((' ' + cls + ' ').indexOf(' new ') !== -1) return true;
+            if (c.hasAttribute('disabled')) return true;
+            var flags = ['data-outside', 'data-other-month', 'data-adjacent'];
+            for (var j = 0; j < flags.length; j++) {
+                var v = (c.getAttribute(flags[j]) || '').toLowerCase();
+                if (v === 'true' || v === '1' || v === 'yes') return true;
+            }
+            return false;
+        }
+        var old = document.querySelectorAll('[' + mark + ']');
+        for (var k = 0; k < old.length; k++) old[k].removeAttribute(mark);
+        var cells = calendarCells(sel);
+        var enabled = [];
+        for (var n = 0; n < cells.length; n++) {
+            if (!isDisabled(cells[n])) enabled.push(cells[n]);
+        }
+        var names = ['data-date', 'data-day', 'aria-label', 'title', 'data-testid'];
+        for (var a = 0; a < enabled.length; a++) {
+            var parts = [];
+            for (var b = 0; b < names.length; b++) {
+                var val = enabled[a].getAttribute(names[b]);
+                if (val) parts.push(val);
+            }
+            var text = parts.join(' ');
+            if (text.indexOf(iso) !== -1 || text.indexOf(isoSlash) !== -1) {
+                enabled[a].setAttribute(mark, 'attr');
+                return 'attr';
+            }
+        }
+        if (attrOnly) return '';
+        for (var t = 0; t < enabled.length; t++) {
+            if ((enabled[t].innerText || enabled[t].textContent || '').trim() === day) {
+                enabled[t].setAttribute(mark, 'text');
+                return 'text';
+            }
+        }
+        return '';
+    """
+    _DATE_CELL_MARK_ATTR = 'data-rpa-date-pick'
+
     def _try_pick_date_in_view(self, context, target_day: str, target_iso: str, *, attr_only: bool = False) -> bool:
         """尝试在当前视图中选择目标日期
 
@@ -1271,6 +1340,50 @@ class DatePicker:
             attr_only: 仅使用属性匹配（完整 ISO 日期），跳过纯文本兜底。
                        用于尚未导航到目标月份时，防止误点当前月份中同一天数的日期。
         """
+        css = ', '.join(
+            sel.split(':', 1)[1] if sel.startswith('css:') else sel
+            for sel in self.DATE_CELL_SELECTORS
+        )
+        keywords = [k for k in self.DISABLED_KEYWORDS if k not in ('today', 'current')]
+        try:
+            matched = context.run_js(
+                self._MARK_DATE_CELL_JS,
+                css,
+                target_day,
+                target_iso,
+                target_iso.replace('-', '/'),
+                keywords,
+                attr_only,
+                self._DATE_CELL_MARK_ATTR,
+            )
+        except Exception as e:
+            logger.debug(f"JS 批量匹配日期格子失败，回退逐个匹配: {e}")
+            return self._try_pick_date_in_view_by_elements(
+                context, target_day, target_iso, attr_only=attr_only
+            )
+
+        if not matched:
+            return False
+        try:
+            cell = context.ele(f'css:[{self._DATE_CELL_MARK_ATTR}]', timeout=0.5)
+            if not cell:
+                return False
+            try:
+                cell.wait.clickable()
+            except Exception:
+                pass
+            cell.click(by_js=None)
+            logger.info(f"已选择日期: {target_iso}")
+            time.sleep(0.3)
+            return True
+        except Exception as e:
+            logger.debug(f"点击已匹配的日期格子失败: {e}")
+            return False
+
+    def _try_pick_date_in_view_by_elements(
+        self, context, target_day: str, target_iso: str, *, attr_only: bool = False
+    ) -> bool:
+        """_try_pick_date_in_view 的 Python 侧兜底：逐个读取格子属性/文本匹配。"""
         date_cells = []
         # 尝试所有选择器
         for selector in self.DATE_CELL_SELECTORS:
@@ -1390,23 +1503,43 @@ class SendProposalsResult:
 class ProposalSender:
     """Proposal发送类，负责核心的RPA操作"""
 
-    def __init__(self, browser: BrowserManager, template_manager: TemplateManager, console: Console, config: ConfigManager):
+    def __init__(
+        self,
+        browser: BrowserManager,
+        template_manager: TemplateManager,
+        console: Console,
+        config: ConfigManager,
+        settings: dict | None = None,
+    ):
         self.browser = browser
         self.template_manager = template_manager
         self.console = console
         self.max_scrolls = 100
         self.max_consecutive_errors = 3
         self._stop_requested = False
-        # 从配置中读取弹窗等待时间，默认 20 秒，用于应对 iframe 加载较慢的情况
-        settings = config.load_settings()
+        # 从配置中读取弹窗等待时间，默认 20 秒，用于应对 iframe 加载较慢的情况；
+        # 组合根已加载过 settings 时直接复用同一份，不再重复读取
+        if settings is None:
+            settings = config.load_settings()
         self._apply_settings(settings)
         self.modal_poll_interval = 0.2
+        # 缓存 (期望值, 选项列表) -> 自动匹配到的选项下标，后续弹窗选项相同时跳过相似度计算
+        self._term_match_cache: dict[tuple, int] = {}
         # 缓存每个 Partner Group 文本达到唯一匹配所需的最短输入长度
         self._partner_group_prefix_len_cache: dict[str, int] = {}
         # 缓存当前日期，保证同一批次内所有 proposal 使用一致的 T+1
         self._cached_today: date | None = None
         self.counted_attr = 'data-impact-rpa-counted'
         self.clicked_attr = 'data-impact-rpa-clicked'
+        # 每个 Send Proposal 按钮首次被扫描到时打上的稳定序号，点击前按序号重新取句柄
+        self.index_attr = 'data-impact-rpa-idx'
+        self._button_seq = 0
+        # 本会话内记住提交/确认按钮最近一次命中的查找策略，后续优先只走该策略
+        self._submit_js_misses = 0
+        self._understand_probe: str | None = None
+        # 弹窗内常用元素句柄缓存，按弹窗 iframe 对象区分，换了弹窗即整体失效
+        self._modal_handles_owner = None
+        self._modal_handles: dict = {}
         # TODO: 优化方向 - 在网页上判断联盟客是否已点击过，避免重复处理
         # 可以通过检查页面上是否有已发送的标记、按钮状态变化、或DOM结构变化来判断
         self.config = config
@@ -1431,7 +1564,7 @@ class ProposalSender:
             'no_progress_frames': 0,
             'last_scroll_position': 0,
             'stuck_frames': 0,
-            'max_stuck_frames': 30,  # 连续30帧无进展认为卡顿
+            'max_stuck_frames': self._MAX_STUCK_FRAMES,
         }
 
     def request_stop(self) -> None:
@@ -1442,6 +1575,19 @@ class ProposalSender:
     def clear_stop_request(self) -> None:
         self._stop_requested = False
 
+    # 连续错误退避：0.5s 起按 2 的幂增长，封顶 5s
+    _ERROR_BACKOFF_BASE = 0.5
+    _ERROR_BACKOFF_MAX = 5.0
+
+    def _backoff(self, consecutive_errors: int) -> None:
+        """按连续错误次数指数退避；等待期间收到停止请求会立即返回。"""
+        delay = min(self._ERROR_BACKOFF_MAX, self._ERROR_BACKOFF_BASE * 2 ** max(consecutive_errors - 1, 0))
+        logger.debug("连续错误 {} 次，退避 {:.1f}s 后重试", consecutive_errors, delay)
+        wait_until(lambda: self._stop_requested, timeout=delay, interval=0.1)
+
+    # 每帧滚动后已轮询等待新内容（最多 scroll_delay 秒），连续 3 帧既无新按钮也滚不动即视为到底
+    _MAX_STUCK_FRAMES = 3
+
     def _reset_scroll_progress(self):
         """重置滚动进度追踪"""
         self._scroll_progress = {
@@ -1449,11 +1595,45 @@ class ProposalSender:
             'no_progress_frames': 0,
             'last_scroll_position': 0,
             'stuck_frames': 0,
-            'max_stuck_frames': 30,
+            'max_stuck_frames': self._MAX_STUCK_FRAMES,
         }
 
+    # 列表内容量快照：Send Proposal 所在按钮数 + 页面高度，任一变化即视为新内容已加载
+    # 虚拟列表滚动时按钮总数与页面高度可能都不变，因此同时统计尚未打序号的按钮（新渲染出来的行）
+    _CONTENT_SNAPSHOT_JS = """
+    const sel = 'button[data-testid="uicl-button"]';
+    return document.querySelectorAll(sel).length
+        + ':' + document.querySelectorAll(sel + ':not([' + arguments[0] + '])').length
+        + ':' + document.documentElement.scrollHeight;
+    """
+
+    def _content_snapshot(self) -> str | None:
+        try:
+            return self.browser.tab.run_js(self._CONTENT_SNAPSHOT_JS, self.index_attr)
+        except Exception:
+            return None
+
+    def _scroll_and_wait_for_content(self, pixels: int = 500) -> bool:
+        """滚动后轮询内容量变化：新内容一出现即返回，最多等待 scroll_delay 秒（替代固定 sleep）。"""
+        before = self._content_snapshot()
+        if not self.browser.scroll_down(pixels):
+            return False
+        if before is None:
+            time.sleep(self.scroll_delay)
+            return True
+        def _changed() -> bool:
+            now = self._content_snapshot()
+            return now is not None and now != before
+
+        changed = wait_until(_changed, timeout=self.scroll_delay, interval=0.1)
+        if not changed:
+            logger.debug(f"滚动后 {self.scroll_delay:.1f}s 内未检测到新内容（{before}）")
+        return True
+
     def _check_scroll_progress(self, elements_count: int) -> dict:
         """检查滚动进度，检测是否卡顿
+
+        elements_count 为本批次累计见过的按钮数，只增不减。
         
         Returns:
             dict: {
@@ -1465,6 +1645,7 @@ class ProposalSender:
         try:
             # 获取当前滚动位置
             current_scroll = 0
+            at_bottom = False
             try:
                 scroll_info = self.browser.tab.run_js("""
                     (function() {
@@ -1514,6 +1695,8 @@ class ProposalSender:
                 
                 if scroll_info and isinstance(scroll_info, dict):
                     current_scroll = scroll_info.get('position', 0)
+                    max_scroll = scroll_info.get('maxScroll')
+                    at_bottom = isinstance(max_scroll, (int, float)) and current_scroll >= max_scroll - 2
             except Exception as e:
                 logger.debug(f"获取滚动位置失败: {e}")
                 current_scroll = self._scroll_progress['last_scroll_position']
@@ -1552,12 +1735,21 @@ class ProposalSender:
             self._scroll_progress['no_progress_frames'] += 1
             self._scroll_progress['stuck_frames'] += 1
             
-            is_stuck = self._scroll_progress['stuck_frames'] >= self._scroll_progress['max_stuck_frames']
+            stuck_frames = self._scroll_progress['stuck_frames']
+            # 已在底部且至少一次滚动后（已等过 scroll_delay）仍无新按钮，说明列表已到头，无需凑满帧数
+            if at_bottom and stuck_frames >= 2:
+                return {
+                    'is_stuck': True,
+                    'progress_type': 'bottom',
+                    'details': f'已到达列表底部，连续 {stuck_frames} 帧无新按钮'
+                }
+
+            is_stuck = stuck_frames >= self._scroll_progress['max_stuck_frames']
             
             return {
                 'is_stuck': is_stuck,
                 'progress_type': 'stuck',
-                'details': f'连续 {self._scroll_progress["stuck_frames"]} 帧无进展'
+                'details': f'连续 {stuck_frames} 帧无进展'
             }
             
         except Exception as e:
@@ -1649,39 +1841,40 @@ class ProposalSender:
         说明：Impact 的 DOM/测试 id 可能变动，单一 selector 容易导致一直“找不到按钮 → 滚动”。
         """
         results: list = []
-        seen: set[int] = set()
+        seen: set = set()
 
         def _add(ele) -> None:
             if not ele:
                 return
-            key = id(ele)
+            # 按 DOM 节点身份去重：同一按钮经不同文本节点回溯会得到不同的 Python 句柄对象，
+            # id(ele) 无法识别；backend node id 在同一页面内唯一
+            key = getattr(ele, '_backend_id', None) or id(ele)
             if key in seen:
                 return
             seen.add(key)
             results.append(ele)
 
-        # 策略1：优先按 uicl-button testid（历史实现）
+        # 策略1：优先按 uicl-button testid（历史实现）；文本过滤在浏览器内由 XPath 完成，
+        # 避免对页面上每个按钮单独读取 .text
         try:
-            btns = self.browser.find_elements('css:button[data-testid="uicl-button"]', timeout=1.5)
+            btns = self.browser.find_elements(
+                SEND_PROPOSAL_BUTTON_XPATH,
+                timeout=1.5,
+            )
             for b in btns or []:
-                try:
-                    if 'Send Proposal' in ((b.text or '').strip()):
-                        _add(b)
-                except Exception:
-                    continue
+                _add(b)
         except Exception:
             pass
 
-        # 策略2：直接扫描所有 button 文本
+        # 策略2：不限 testid，按钮文本同样交给 XPath 在浏览器内过滤
         if not results:
             try:
-                btns = self.browser.find_elements('tag:button', timeout=1.5)
+                btns = self.browser.find_elements(
+                    'xpath://button[contains(normalize-space(.), "Send Proposal")]',
+                    timeout=1.5,
+                )
                 for b in btns or []:
-                    try:
-                        if 'Send Proposal' in ((b.text or '').strip()):
-                            _add(b)
-                    except Exception:
-                        continue
+                    _add(b)
             except Exception:
                 pass
 
@@ -1768,9 +1961,11 @@ class ProposalSender:
         clicked_count = 0             # 已成功点击的 Send Proposal 按钮数量
         total_scrolls = 0             # 已执行的页面向下滚动次数（用于查找新按钮）
         consecutive_errors = 0        # 连续发生的异常次数（如超限则尝试重连）
+        backed_off_errors = 0         # 已为哪一次连续错误退避过，避免错误后的正常轮次重复等待
         pending_batch_buttons = 0     # 尚未完成点击的按钮批次数，控制批量操作时逻辑
         total_detected_buttons = 0    # 累计检测到的所有 Send Proposal 按钮总数
         empty_scrolls = 0             # 连续未检测到新按钮的滚动次数（可能已无可点目标）
+        seen_indices: set[str] = set()  # 本批次见过的按钮序号，虚拟列表按钮数不变时也能识别新按钮
         
         # 根据目标数量动态调整最大滚动次数（至少为目标数量的3倍，但不超过固定上限）
         # 这样可以确保有足够的滚动次数来找到目标数量的按钮
@@ -1803,12 +1998,17 @@ class ProposalSender:
                 self.console.print("[yellow]检测到停止请求，结束当前发送任务[/yellow]")
                 logger.info(f"发送任务被请求停止，已发送 {clicked_count}/{max_count} 个")
                 break
+            # 刚发生新的错误：按连续错误次数指数退避，给页面恢复时间，避免立即重试打满 CDP
+            if backed_off_errors < consecutive_errors < self.max_consecutive_errors:
+                self._backoff(consecutive_errors)
+            backed_off_errors = consecutive_errors
             # 检查是否需要重连
             if consecutive_errors >= self.max_consecutive_errors:
                 self.console.print("[yellow]连续多次错误，尝试重新连接浏览器...[/yellow]")
                 if self.browser.reconnect():
                     consecutive_errors = 0
-                    time.sleep(1)
+                    # 重连后页面通常已加载完成，就绪检查会立即返回，无需固定等待 1 秒
+                    self.browser.wait_for_page_ready(timeout=3)
                 else:
                     err = Exception("浏览器重连失败")
                     exception_handler.log_exception(
@@ -1825,38 +2025,35 @@ class ProposalSender:
             
             try:
                 # 查找当前可见的所有 Send Proposal 按钮（多策略兜底）
-                buttons = self._find_send_proposal_buttons()
+                entries = self._collect_button_entries()
                 
-                if buttons is None:
+                if entries is None:
                     consecutive_errors += 1
                     if self.browser.reconnect():
                         consecutive_errors = 0
-                        time.sleep(1)
+                        self.browser.wait_for_page_ready(timeout=3)
                     continue
                 
-                # _find_send_proposal_buttons 已过滤为目标按钮，这里直接使用
-                send_proposal_buttons = [b for b in (buttons or []) if b]
-                
                 available_buttons = []
                 newly_counted = 0
-                raw_buttons_count = len(send_proposal_buttons)
+                raw_buttons_count = len(entries)
                 skipped_clicked_count = 0
                 already_counted_count = 0
                 mark_count_failed = 0
-                for btn in send_proposal_buttons:
-                    if btn.attr(self.clicked_attr) == 'true':
+                for idx, state, selected_tab in entries:
+                    seen_indices.add(idx)
+                    if state == 'clicked':
                         skipped_clicked_count += 1
                         continue
-                    if btn.attr(self.counted_attr) != 'true':
-                        if self._mark_button_state(btn, self.counted_attr):
-                            pending_batch_buttons += 1
-                            total_detected_buttons += 1
-                            newly_counted += 1
-                        else:
-                            mark_count_failed += 1
+                    if state == 'new':
+                        pending_batch_buttons += 1
+                        total_detected_buttons += 1
+                        newly_counted += 1
+                    elif state == 'mark_failed':
+                        mark_count_failed += 1
                     else:
                         already_counted_count += 1
-                    available_buttons.append(btn)
+                    available_buttons.append((idx, selected_tab))
                 
                 if newly_counted > 0:
                     empty_scrolls = 0
@@ -1864,7 +2061,7 @@ class ProposalSender:
                         f"[dim]检测到新按钮 {newly_counted} 个，当前批次待发送 {pending_batch_buttons} 个（累计 {total_detected_buttons} 个）[/dim]"
                     )
                     logger.debug(
-                        f"新增 {newly_counted} 个 Send Proposal 按钮，当前批次待发送 {pending_batch_buttons} 个"
+                        "新增 {} 个 Send Proposal 按钮，当前批次待发送 {} 个", newly_counted, pending_batch_buttons
                     )
                 
                 if not available_buttons:
@@ -1875,20 +2072,22 @@ class ProposalSender:
                             )
                         elif skipped_clicked_count == raw_buttons_count:
                             logger.debug(
-                                f"当前页面检测到 {raw_buttons_count} 个 Send Proposal 按钮，"
-                                f"但全部已标记为已点击({self.clicked_attr}=true)，准备滚动加载更多。"
+                                "当前页面检测到 {} 个 Send Proposal 按钮，"
+                                "但全部已标记为已点击({}=true)，准备滚动加载更多。",
+                                raw_buttons_count, self.clicked_attr,
                             )
                         else:
                             logger.debug(
-                                f"当前页面检测到 {raw_buttons_count} 个 Send Proposal 按钮，"
-                                f"可用按钮为 0（已点击标记: {skipped_clicked_count}，"
-                                f"已计数未点击: {already_counted_count}，计数标记失败: {mark_count_failed}），"
-                                "准备滚动加载更多。"
+                                "当前页面检测到 {} 个 Send Proposal 按钮，"
+                                "可用按钮为 0（已点击标记: {}，"
+                                "已计数未点击: {}，计数标记失败: {}），"
+                                "准备滚动加载更多。",
+                                raw_buttons_count, skipped_clicked_count, already_counted_count, mark_count_failed,
                             )
                         empty_scrolls += 1
                         
                         # 检查滚动进度（防卡顿机制）
-                        scroll_check = self._check_scroll_progress(raw_buttons_count)
+                        scroll_check = self._check_scroll_progress(len(seen_indices))
                         if scroll_check['is_stuck']:
                             logger.warning(
                                 f"检测到滚动卡顿：{scroll_check['details']}，"
@@ -1912,25 +2111,25 @@ class ProposalSender:
                             )
                             break
                         logger.debug(
-                            f"执行第 {total_scrolls + 1} 次滚动（空滚动累计: {empty_scrolls}/{max_empty_scrolls}，"
-                            f"已发送: {clicked_count}/{max_count}，累计检测到按钮: {total_detected_buttons}，"
-                            f"滚动状态: {scroll_check['details']}）。"
+                            "执行第 {} 次滚动（空滚动累计: {}/{}，已发送: {}/{}，累计检测到按钮: {}，滚动状态: {}）。",
+                            total_scrolls + 1, empty_scrolls, max_empty_scrolls, clicked_count, max_count,
+                            total_detected_buttons, scroll_check['details'],
                         )
-                        if not self.browser.scroll_down(500):
+                        if not self._scroll_and_wait_for_content(500):
                             consecutive_errors += 1
                             logger.warning(
                                 f"滚动失败，连续错误计数 +1 -> {consecutive_errors} "
                                 f"(已发送: {clicked_count}/{max_count})"
                             )
                             continue
-                        time.sleep(self.scroll_delay)
                         total_scrolls += 1
                         continue
                     else:
                         logger.debug(
-                            f"存在待发送计数({pending_batch_buttons})但当前未找到可用按钮；"
-                            f"本轮检测到按钮总数 {raw_buttons_count}（已点击标记: {skipped_clicked_count}），"
-                            "重置待发送计数以避免阻塞。"
+                            "存在待发送计数({})但当前未找到可用按钮；"
+                            "本轮检测到按钮总数 {}（已点击标记: {}），"
+                            "重置待发送计数以避免阻塞。",
+                            pending_batch_buttons, raw_buttons_count, skipped_clicked_count,
                         )
                         pending_batch_buttons = 0
                         continue
@@ -1942,7 +2141,28 @@ class ProposalSender:
                 
                 # 遍历当前可见的按钮并点击
                 should_scroll_after_batch = False
-                for btn in send_proposal_buttons:
+                # 弹窗提交会改动列表 DOM，成功一个后回到外层重新查询，避免后续句柄失效再重试
+                requery_after_success = False
+                if skip_remaining > 0:
+                    # 起始偏移阶段按序号一次 JS 批量打上已点击标记，无需逐个取句柄再设置属性
+                    head = [idx for idx, _ in send_proposal_buttons[:skip_remaining]]
+                    marked = self._mark_clicked_by_index(head)
+                    if marked is not None:
+                        for _ in marked:
+                            skip_remaining -= 1
+                            skipped_before_start += 1
+                            if pending_batch_buttons > 0:
+                                pending_batch_buttons -= 1
+                            if pending_batch_buttons == 0:
+                                should_scroll_after_batch = True
+                        if marked and skip_remaining == 0:
+                            logger.info(f"已完成起始偏移，累计跳过 {skipped_before_start} 个按钮，开始正式发送")
+                            self.console.print(
+                                f"[dim]已跳过前 {skipped_before_start} 个目标，开始正式发送[/dim]"
+                            )
+                        head_set = set(head)
+                        send_proposal_buttons = [e for e in send_proposal_buttons if e[0] not in head_set]
+                for idx, prefetched_tab in send_proposal_buttons:
                     if self._stop_requested:
                         self.console.print("[yellow]检测到停止请求，结束当前发送任务[/yellow]")
                         logger.info(f"发送任务在批次内被请求停止，已发送 {clicked_count}/{max_count} 个")
@@ -1956,6 +2176,12 @@ class ProposalSender:
                         self.console.print(f"\n[bold cyan]===== 完成！共发送了 {clicked_count} 个 Send Proposal =====[/bold cyan]")
                         return SendProposalsResult(clicked_count=clicked_count, completed_all=True)
 
+                    # 按序号重新取句柄，避免沿用弹窗开关前拿到的旧句柄
+                    btn = self._button_by_index(idx)
+                    if not btn:
+                        logger.debug("序号 {} 的 Send Proposal 按钮已不在页面上，跳过", idx)
+                        continue
+
                     if skip_remaining > 0:
                         if self._mark_button_state(btn, self.clicked_attr):
                             skip_remaining -= 1
@@ -1974,16 +2200,29 @@ class ProposalSender:
                         continue
                     
                     try:
-                        selected_tab = self._get_selected_tab_value(btn)
+                        # 批量标记脚本分配的序号（纯数字）说明祖先链已在页面内查过，不必再走同条件的 XPath
+                        selected_tab = prefetched_tab or self._get_selected_tab_value(
+                            btn, ancestor_checked=not idx.startswith('py')
+                        )
                         
-                        parent = btn.parent()
+                        # 优先一次 JS 完成卡片定位、滚动与 hover；失败再走逐级父节点的 CDP hover
+                        js_ok, card = self._hover_card_via_js(btn)
+                        # JS 已确认没有卡片祖先时，同条件的 XPath 查找必然落空，直接退回父节点
+                        parent = card or (None if js_ok else self._find_hover_card(btn)) or btn.parent()
+                        hovered = card is not None
+                        # 卡片已滚到视口中央后，换更外层祖先重试时无需再次滚动；仅在点击报无位置时重新滚动
+                        needs_reveal = not hovered
                         for retry_idx in range(10):
                             if parent:
                                 try:
-                                    self.browser.scroll_to_element(parent)
-                                    time.sleep(0.2)
-                                    parent.hover()
-                                    time.sleep(0.3)
+                                    if not hovered:
+                                        if needs_reveal:
+                                            self._reveal_hover_target(parent)
+                                            needs_reveal = False
+                                        parent.hover()
+                                    hovered = False
+                                    # hover 后按钮一可见即点击，最多等 0.3 秒（替代固定 sleep）
+                                    self._wait_displayed(btn, timeout=0.3)
                                     
                                     clicked = False
                                     try:
@@ -1992,6 +2231,7 @@ class ProposalSender:
                                     except Exception as click_err:
                                         error_msg = str(click_err).lower()
                                         if 'norect' in error_msg or '没有位置' in error_msg:
+                                            needs_reveal = True
                                             try:
                                                 parent.click(by_js=True)
                                                 clicked = True
@@ -2004,7 +2244,7 @@ class ProposalSender:
                                         raise Exception("点击按钮失败")
                                     
                                     # 先处理弹窗，只有成功时才标记按钮和增加计数
-                                    time.sleep(0.5)
+                                    # （弹窗 iframe 由 _wait_for_modal_iframe 轮询等待，无需固定 sleep）
                                     modal_success = self._handle_proposal_modal(selected_tab, template_content)
                                     
                                     if modal_success:
@@ -2021,6 +2261,7 @@ class ProposalSender:
                                             pending_batch_buttons = max(pending_batch_buttons - 1, 0)
                                         if pending_batch_buttons == 0:
                                             should_scroll_after_batch = True
+                                        requery_after_success = True
                                     else:
                                         # 弹窗处理失败，记录警告但不标记按钮
                                         logger.warning(f"弹窗处理失败，跳过此按钮 (类别: {selected_tab})")
@@ -2029,8 +2270,7 @@ class ProposalSender:
                                     
                                     break
                                 except Exception as e:
-                                    error_msg = str(e).lower()
-                                    if 'disconnect' in error_msg or 'context' in error_msg or 'target closed' in error_msg:
+                                    if is_disconnect_error(e):
                                         raise
                                     if retry_idx < 9:
                                         parent = parent.parent()
@@ -2038,9 +2278,10 @@ class ProposalSender:
                                         raise
                             else:
                                 break
+                        if requery_after_success:
+                            break
                     except Exception as e:
-                        error_msg = str(e).lower()
-                        if 'disconnect' in error_msg or 'context' in error_msg or 'target closed' in error_msg or 'no such' in error_msg:
+                        if is_disconnect_error(e, extra=('no such',)):
                             logger.warning(f"页面可能已刷新: {e}")
                             self.console.print("[yellow]⚠ 页面可能已刷新，尝试重连...[/yellow]")
                             consecutive_errors += 1
@@ -2055,10 +2296,13 @@ class ProposalSender:
                 
                 if clicked_count >= max_count:
                     break
+                if self._stop_requested:
+                    # 交给循环顶部统一处理停止，避免先滚动再等待一个 scroll_delay
+                    continue
                 
                 if should_scroll_after_batch:
                     # 检查滚动进度（防卡顿机制）
-                    scroll_check = self._check_scroll_progress(len(send_proposal_buttons))
+                    scroll_check = self._check_scroll_progress(len(seen_indices))
                     if scroll_check['is_stuck']:
                         logger.warning(
                             f"批次后滚动检测到卡顿：{scroll_check['details']}，"
@@ -2070,10 +2314,9 @@ class ProposalSender:
                         )
                         break
                     
-                    if not self.browser.scroll_down(500):
+                    if not self._scroll_and_wait_for_content(500):
                         consecutive_errors += 1
                         continue
-                    time.sleep(self.scroll_delay)
                     total_scrolls += 1
                     self.console.print(
                         f"[dim]当前批次已发送完，滚动第 {total_scrolls} 次加载更多按钮[/dim]"
@@ -2085,7 +2328,7 @@ class ProposalSender:
                     continue
 
                 # 检查滚动进度（防卡顿机制）
-                scroll_check = self._check_scroll_progress(len(send_proposal_buttons))
+                scroll_check = self._check_scroll_progress(len(seen_indices))
                 if scroll_check['is_stuck']:
                     logger.warning(
                         f"常规滚动检测到卡顿：{scroll_check['details']}，"
@@ -2097,16 +2340,14 @@ class ProposalSender:
                     )
                     break
 
-                if not self.browser.scroll_down(500):
+                if not self._scroll_and_wait_for_content(500):
                     consecutive_errors += 1
                     continue
-                time.sleep(self.scroll_delay)
                 total_scrolls += 1
-                self.console.print(f"[dim]滚动第 {total_scrolls} 次，已发送 {clicked_count}/{max_count} 个[/dim]")
+                logger.debug("滚动第 {} 次，已发送 {}/{} 个", total_scrolls, clicked_count, max_count)
                 
             except Exception as e:
-                error_msg = str(e).lower()
-                if 'disconnect' in error_msg or 'context' in error_msg or 'target closed' in error_msg:
+                if is_disconnect_error(e):
                     logger.warning(f"检测到页面断开: {e}")
                     consecutive_errors += 1
                 else:
@@ -2115,7 +2356,7 @@ class ProposalSender:
                         f"滚动次数: {total_scrolls}, 连续错误: {consecutive_errors}, "
                         f"空滚动: {empty_scrolls}, 待发送计数: {pending_batch_buttons}）"
                     )
-                    if 'template_term_not_found' in error_msg:
+                    if 'template_term_not_found' in str(e).lower():
                         raise
                     consecutive_errors += 1
         
@@ -2155,15 +2396,12 @@ class ProposalSender:
             # 两种布局，在 Creator Search 和 Partner Marketplace 中一致：
             # 1) 卡片/网格视图：css:.iui-grid > .iui-card:nth-child(N) .creator-card
             # 2) 表格视图屏底：css:div.table-body > div:nth-child(N)
+            # 两种布局合并为一条 selector 一次查询，表格视图下不再先白等卡片视图的 3 秒超时
             row_el = self.browser.find_element(
-                f"css:.iui-grid > .iui-card:nth-child({row_index}) .creator-card",
+                f"css:.iui-grid > .iui-card:nth-child({row_index}) .creator-card, "
+                f"div.table-body > div:nth-child({row_index})",
                 timeout=3,
             )
-            if not row_el:
-                row_el = self.browser.find_element(
-                    f"css:div.table-body > div:nth-child({row_index})",
-                    timeout=3,
-                )
 
             if not row_el:
                 logger.warning(f"未找到表格行: row_index={row_index}")
@@ -2186,16 +2424,11 @@ class ProposalSender:
                 logger.info(f"第 {row_index} 行 [{creator_name}] 已发送过，跳过")
                 return False, creator_name, psi_id, True  # 跳过
             
-            # 点击行后出现的 Send Proposal 按钮：优先按文本查找并点击
-            send_btn = self.browser.find_element("text:Send Proposal", timeout=10)
+            # 点击行后出现的 Send Proposal 按钮：文本过滤在浏览器内由 XPath 完成；
+            # 优先 button，等满超时仍未出现时页面已渲染完，含文本元素的兜底只需短暂查找
+            send_btn = self.browser.find_element(SEND_PROPOSAL_TRIGGER_BUTTON_XPATH, timeout=10)
             if not send_btn:
-                buttons = self.browser.find_elements('css:button[data-testid="uicl-button"]')
-                for btn in buttons or []:
-                    if not btn:
-                        continue
-                    if 'Send Proposal' in (btn.text or ''):
-                        send_btn = btn
-                        break
+                send_btn = self.browser.find_element(SEND_PROPOSAL_TRIGGER_TEXT_XPATH, timeout=1)
             if not send_btn:
                 logger.warning("点击行后未找到 Send Proposal 按钮")
                 self.console.print("[red]点击行后未找到 Send Proposal 按钮[/red]")
@@ -2219,8 +2452,7 @@ class ProposalSender:
                     return True, creator_name, psi_id, False  # 弹窗处理成功但未检测到消息
             return False, creator_name, psi_id, False
         except Exception as e:
-            error_msg = str(e).lower()
-            if 'disconnect' in error_msg or 'context' in error_msg or 'target closed' in error_msg:
+            if is_disconnect_error(e):
                 raise
             logger.error(f"按表格行发送失败: {e}")
             self.console.print(f"[red]按表格行发送失败: {e}[/red]")
@@ -2296,21 +2528,17 @@ class ProposalSender:
             slideout = self.browser.find_element('css:[class*="slideout"], [class*="detail"], [class*="panel"]', timeout=1)
             if slideout:
                 # 查找包含 psi 的链接或属性
-                links = slideout.eles('tag:a', timeout=0.5)
+                links = slideout.eles('css:a[href*="psi="]', timeout=0.2)
                 for link in links or []:
-                    href = link.attr('href') or ''
-                    if 'psi=' in href:
-                        import re
-                        match = re.search(r'psi=([a-f0-9-]+)', href)
-                        if match:
-                            return match.group(1)
+                    match = _PSI_RE.search(link.attr('href') or '')
+                    if match:
+                        return match.group(1)
             
             # 方法2：从 iframe src 中提取
             iframe = self.browser.find_element('css:iframe[src*="psi="]', timeout=0.5)
             if iframe:
                 src = iframe.attr('src') or ''
-                import re
-                match = re.search(r'psi=([a-f0-9-]+)', src)
+                match = _PSI_RE.search(src)
                 if match:
                     return match.group(1)
             
@@ -2379,69 +2607,72 @@ class ProposalSender:
         self._cached_today = date.today()
         logger.info(f"本批次使用日期: T={self._cached_today.isoformat()}, T+1={self._cached_today + timedelta(days=1)}")
 
-        while sent_count < max_count:
-            if self._stop_requested:
-                self.console.print("[yellow]检测到停止请求，结束当前发送任务[/yellow]")
-                logger.info(f"Creator Search 任务被请求停止，已发送 {sent_count}/{max_count} 个")
-                break
-            if consecutive_errors >= max_consecutive_errors:
-                self.console.print(f"[red]连续 {max_consecutive_errors} 次错误，停止发送[/red]")
-                break
-            
-            self.console.print(f"\n[dim]正在处理第 {current_row} 行...[/dim]")
-            
-            try:
-                success, creator_name, psi_id, was_skipped = self.send_proposal_by_table_row(
-                    current_row, template_content, skip_names=sent_names
-                )
+        # 发送记录在结束时一次写盘；finally 保证异常中断时已发送的 Creator 也会落盘、下次不会重复发送
+        try:
+            while sent_count < max_count:
+                if self._stop_requested:
+                    self.console.print("[yellow]检测到停止请求，结束当前发送任务[/yellow]")
+                    logger.info(f"Creator Search 任务被请求停止，已发送 {sent_count}/{max_count} 个")
+                    break
+                if consecutive_errors >= max_consecutive_errors:
+                    self.console.print(f"[red]连续 {max_consecutive_errors} 次错误，停止发送[/red]")
+                    break
                 
-                # 检查是否被跳过（已发送过）
-                if was_skipped:
-                    self.console.print(f"[yellow][SKIP] 第 {current_row} 行 [{creator_name}] 已发送过，跳过[/yellow]")
-                    skipped_count += 1
-                    current_row += 1
-                    self._close_creator_slideout()
-                    time.sleep(0.3)
-                    continue
+                self.console.print(f"\n[dim]正在处理第 {current_row} 行...[/dim]")
                 
-                if success:
-                    sent_count += 1
-                    consecutive_errors = 0
-                    record = {
-                        'row': current_row,
-                        'name': creator_name,
-                        'psi': psi_id,
-                        'status': 'success',
-                        'timestamp': datetime.now().isoformat(),
-                    }
-                    sent_records.append(record)
-                    # 添加到已发送列表
-                    if creator_name:
-                        sent_names.add(creator_name)
+                try:
+                    success, creator_name, psi_id, was_skipped = self.send_proposal_by_table_row(
+                        current_row, template_content, skip_names=sent_names
+                    )
                     
-                    self.console.print(f"[green][OK] [{sent_count}/{max_count}] 第 {current_row} 行 [{creator_name or '未知'}] 发送成功[/green]")
-                    logger.info(f"发送成功: row={current_row}, name={creator_name}, psi={psi_id}")
+                    # 检查是否被跳过（已发送过）
+                    if was_skipped:
+                        self.console.print(f"[yellow][SKIP] 第 {current_row} 行 [{creator_name}] 已发送过，跳过[/yellow]")
+                        skipped_count += 1
+                        current_row += 1
+                        self._close_creator_slideout()
+                        time.sleep(0.3)
+                        continue
                     
-                    # 关闭侧边栏（如果有的话），准备下一个
-                    self._close_creator_slideout()
-                else:
+                    if success:
+                        sent_count += 1
+                        consecutive_errors = 0
+                        record = {
+                            'row': current_row,
+                            'name': creator_name,
+                            'psi': psi_id,
+                            'status': 'success',
+                            'timestamp': datetime.now().isoformat(),
+                        }
+                        sent_records.append(record)
+                        # 添加到已发送列表
+                        if creator_name:
+                            sent_names.add(creator_name)
+                        
+                        self.console.print(f"[green][OK] [{sent_count}/{max_count}] 第 {current_row} 行 [{creator_name or '未知'}] 发送成功[/green]")
+                        logger.info(f"发送成功: row={current_row}, name={creator_name}, psi={psi_id}")
+                        
+                        # 关闭侧边栏（如果有的话），准备下一个
+                        self._close_creator_slideout()
+                    else:
+                        consecutive_errors += 1
+                        self.console.print(f"[yellow][SKIP] 第 {current_row} 行 [{creator_name or '未知'}] 发送失败，跳过[/yellow]")
+                    
+                    current_row += 1
+                    time.sleep(0.5)  # 短暂等待页面稳定
+                    
+                except Exception as e:
+                    if is_disconnect_error(e):
+                        raise
                     consecutive_errors += 1
-                    self.console.print(f"[yellow][SKIP] 第 {current_row} 行 [{creator_name or '未知'}] 发送失败，跳过[/yellow]")
-                
-                current_row += 1
-                time.sleep(0.5)  # 短暂等待页面稳定
-                
-            except Exception as e:
-                error_msg = str(e).lower()
-                if 'disconnect' in error_msg or 'context' in error_msg or 'target closed' in error_msg:
-                    raise
-                consecutive_errors += 1
-                logger.error(f"处理第 {current_row} 行时出错: {e}")
-                self.console.print(f"[red][ERR] 第 {current_row} 行出错: {e}[/red]")
-                current_row += 1
+                    logger.error(f"处理第 {current_row} 行时出错: {e}")
+                    self.console.print(f"[red][ERR] 第 {current_row} 行出错: {e}[/red]")
+                    current_row += 1
+        finally:
+            records_path = self._save_sent_records(sent_records)
         
-        # 保存发送记录
-        self._save_sent_records(sent_records)
+        if records_path:
+            self.console.print(f"[dim]发送记录已保存到: {os.path.basename(records_path)}[/dim]")
         
         if skipped_count > 0:
             self.console.print(f"[dim]跳过了 {skipped_count} 个已发送的 Creator[/dim]")
@@ -2473,31 +2704,25 @@ class ProposalSender:
         except Exception as e:
             logger.debug(f"关闭侧边栏失败: {e}")
 
-    def _save_sent_records(self, records: list[dict]):
-        """保存发送记录到文件"""
+    def _save_sent_records(self, records: list[dict]) -> str | None:
+        """按当前时间新建记录文件并一次性写入（原子替换），返回文件路径；无记录或失败时返回 None。"""
         if not records:
-            return
+            return None
         try:
-            import json
             log_dir = os.path.join(os.path.dirname(__file__), 'logs')
             os.makedirs(log_dir, exist_ok=True)
-            
             filename = f"creator_search_sent_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
             filepath = os.path.join(log_dir, filename)
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(records, f, ensure_ascii=False, indent=2)
-            
-            logger.info(f"发送记录已保存到: {filepath}")
-            self.console.print(f"[dim]发送记录已保存到: {filename}[/dim]")
+            write_json_atomic(filepath, records, ensure_ascii=False, indent=2)
+            return filepath
         except Exception as e:
             logger.warning(f"保存发送记录失败: {e}")
+            return None
 
     def _load_sent_names(self) -> set[str]:
         """加载所有已发送的 Creator 名称（从 logs 目录中的所有记录文件）"""
         sent_names: set[str] = set()
         try:
-            import json
             import glob
             log_dir = os.path.join(os.path.dirname(__file__), 'logs')
             if not os.path.exists(log_dir):
@@ -2521,18 +2746,84 @@ class ProposalSender:
             logger.warning(f"加载已发送记录失败: {e}")
         return sent_names
 
-    def _get_selected_tab_value(self, btn) -> str | None:
-        """获取按钮所在行的 selected-tab 值"""
+    def _reveal_hover_target(self, ele) -> None:
+        """一次 JS 调用把 hover 目标瞬时滚到视口中央；失败时回退到平滑滚动 + 等待动画。"""
         try:
-            parent = btn.parent()
-            for _ in range(20):
-                if parent:
-                    selected_tab_ele = self.browser.find_element('css:.selected-tab', timeout=0.1, parent=parent)
-                    if selected_tab_ele:
-                        return selected_tab_ele.text.strip()
-                    parent = parent.parent()
-                else:
-                    break
+            ele.run_js('this.scrollIntoView({block: "center", inline: "nearest", behavior: "instant"});')
+            return
+        except Exception:
+            pass
+        self.browser.scroll_to_element(ele)
+        time.sleep(0.2)
+
+    # 从父节点起 closest() 找到卡片/行（按完整 class 词匹配，不误中 arrow、flex-row 之类），
+    # 滚到视口中央并派发冒泡的 mouseover，返回卡片元素；找不到返回 null
+    _HOVER_CARD_JS = """
+    var parent = this.parentElement;
+    var card = parent ? parent.closest('tr, [class~="card"], [class~="row"]') : null;
+    if (!card) { return null; }
+    card.scrollIntoView({block: "center", inline: "nearest", behavior: "instant"});
+    var opts = {bubbles: true, cancelable: true, view: window};
+    card.dispatchEvent(new MouseEvent('mouseover', opts));
+    card.dispatchEvent(new MouseEvent('mouseenter', opts));
+    return card;
+    """
+
+    def _wait_displayed(self, ele, timeout: float) -> bool:
+        try:
+            return bool(ele.wait.displayed(timeout=timeout, raise_err=False))
+        except Exception:
+            time.sleep(timeout)
+            return False
+
+    def _hover_card_via_js(self, btn) -> tuple:
+        """一次 JS 调用完成 hover 目标定位、滚动与悬停，替代逐级 parent() + hover 的多次往返。
+
+        返回 (JS 是否执行成功, 卡片元素或 None)。
+        """
+        try:
+            card = btn.run_js(self._HOVER_CARD_JS)
+        except Exception:
+            return False, None
+        return True, (card if card and not isinstance(card, (bool, str, dict)) else None)
+
+    # 与 _HOVER_CARD_JS 相同的规则：最近的 tr 或 class 中含完整 card/row 词的祖先
+    _HOVER_CARD_XPATH = (
+        'xpath:./ancestor::*[self::tr'
+        ' or contains(concat(" ", normalize-space(@class), " "), " card ")'
+        ' or contains(concat(" ", normalize-space(@class), " "), " row ")][1]'
+    )
+
+    def _find_hover_card(self, btn):
+        """按钮所在的合作伙伴卡片/表格行（hover 后按钮才可点）。"""
+        try:
+            return btn.ele(self._HOVER_CARD_XPATH, timeout=0.5)
+        except Exception:
+            return None
+
+    _SELECTED_TAB_CLASS_XPATH = 'contains(concat(" ", normalize-space(@class), " "), " selected-tab ")'
+    # 最近的含 selected-tab 的祖先下的 selected-tab 节点；类定义时拼好，避免每个按钮重复格式化
+    _SELECTED_TAB_XPATH = (
+        f'xpath:./ancestor::*[.//*[{_SELECTED_TAB_CLASS_XPATH}]][1]'
+        f'//*[{_SELECTED_TAB_CLASS_XPATH}]'
+    )
+
+    def _get_selected_tab_value(self, btn, ancestor_checked: bool = False) -> str | None:
+        """获取按钮所在行的 selected-tab 值
+
+        ancestor_checked 为 True 表示调用方已在页面内按祖先链查过且未命中，直接走备用方案。
+        """
+        try:
+            if not ancestor_checked:
+                # 一次 XPath 在浏览器内找到最近的含 selected-tab 的祖先，避免逐层 parent() 往返；
+                # 节点随按钮一起渲染，无需长时间轮询
+                selected_tab_ele = self.browser.find_element(
+                    self._SELECTED_TAB_XPATH,
+                    timeout=0.5,
+                    parent=btn,
+                )
+                if selected_tab_ele:
+                    return selected_tab_ele.text.strip()
             
             # 备用方案
             selected_tab_ele = self.browser.find_element('css:.selected-tab', timeout=0.5)
@@ -2564,13 +2855,29 @@ class ProposalSender:
             return True
             
         except Exception as e:
-            error_msg = str(e).lower()
-            if 'disconnect' in error_msg or 'context' in error_msg or 'target closed' in error_msg:
+            if is_disconnect_error(e):
                 logger.warning(f"处理弹窗时页面断开: {e}")
                 raise
             logger.error(f"处理弹窗失败: {e}")
         return False
 
+    def _modal_ele(self, iframe, locator: str, timeout: float):
+        """查找弹窗内的常用元素：同一弹窗内已取到且仍挂在 DOM 上的句柄直接复用。"""
+        if self._modal_handles_owner is not iframe:
+            self._modal_handles_owner = iframe
+            self._modal_handles = {}
+        ele = self._modal_handles.get(locator)
+        if ele is not None:
+            try:
+                if ele.states.is_alive:
+                    return ele
+            except Exception:
+                pass
+        ele = iframe.ele(locator, timeout=timeout)
+        if ele:
+            self._modal_handles[locator] = ele
+        return ele
+
     def _is_date_like_trigger(self, ele) -> bool:
         """判断元素是否属于日期/时间相关触发器，避免误点到 Contract Dates 区域的控件。
 
@@ -2601,8 +2908,8 @@ class ProposalSender:
 
         # 文本内容形如日期格式（例如 "May 8, 2026"）
         try:
-            text = re.sub(r'\s+', ' ', (ele.text or '').strip())
-            if re.match(r'^(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{1,2},\s+\d{4}$', text):
+            text = _WHITESPACE_RE.sub(' ', (ele.text or '').strip())
+            if _DATE_TEXT_RE.match(text):
                 return True
         except Exception:
             pass
@@ -2639,23 +2946,11 @@ class ProposalSender:
         # 真实 DOM 结构：Template Term multiselect 内有 <input type="hidden" name="insertionOrderId">
         # Contract Dates 区域的 name 是 startDateTime/endDateTime/lengthOption，不含此字段
         try:
-            hidden = iframe.ele('css:input[name="insertionOrderId"]', timeout=2)
-            if hidden:
-                # 向上至多爬 3 层，找到 data-testid="uicl-multiselect-input" 容器
-                cur = hidden.parent()
-                for _ in range(3):
-                    if not cur:
-                        break
-                    if (cur.attr('data-testid') or '') == 'uicl-multiselect-input':
-                        trigger = cur.ele(
-                            'css:button[data-testid="uicl-multi-select-input-button"]',
-                            timeout=0.3,
-                        )
-                        if trigger and not self._is_date_like_trigger(trigger):
-                            logger.debug("Template Term 触发器：通过 input[name=insertionOrderId] 定位")
-                            return trigger
-                        break
-                    cur = cur.parent()
+            # 容器与按钮的逐级查找合并为一次 XPath，不再每层 parent() + attr() 往返
+            trigger = iframe.ele(TEMPLATE_TERM_TRIGGER_XPATH, timeout=2)
+            if trigger and not self._is_date_like_trigger(trigger):
+                logger.debug("Template Term 触发器：通过 input[name=insertionOrderId] 定位")
+                return trigger
         except Exception as e:
             logger.debug(f"策略1定位 Template Term 触发器失败: {e}")
 
@@ -2668,31 +2963,12 @@ class ProposalSender:
                 logger.debug("未找到 Template Term 标签")
                 return None
 
-            # 向上找到 iui-form-section（最多爬 5 层）
-            cur = term_label.parent()
-            for _ in range(5):
-                if not cur:
-                    break
-                cls = (cur.attr('class') or '')
-                if 'iui-form-section' in cls:
-                    # 只在含 "select-input" 的 field-label-pair 内查找（排除日期时间字段）
-                    try:
-                        field = cur.ele(
-                            'css:div[data-testid="uicl-field-label-pair"][class*="select-input"]',
-                            timeout=0.3,
-                        )
-                    except Exception:
-                        field = None
-                    if field:
-                        trigger = field.ele(
-                            'css:button[data-testid="uicl-multi-select-input-button"]',
-                            timeout=0.3,
-                        )
-                        if trigger and not self._is_date_like_trigger(trigger):
-                            logger.debug("Template Term 触发器：通过 iui-form-section > select-input 定位")
-                            return trigger
-                    break
-                cur = cur.parent()
+            section = term_label.ele(FORM_SECTION_ANCESTOR_XPATH, timeout=0)
+            if section:
+                trigger = section.ele(SELECT_INPUT_TRIGGER_SELECTOR, timeout=0.3)
+                if trigger and not self._is_date_like_trigger(trigger):
+                    logger.debug("Template Term 触发器：通过 iui-form-section > select-input 定位")
+                    return trigger
         except Exception as e:
             logger.debug(f"策略2定位 Template Term 触发器失败: {e}")
 
@@ -2750,6 +3026,36 @@ class ProposalSender:
 
         return None
 
+    # 一次 JS 调用读出容器内所有匹配节点的文本，顺序与 eles(css) 的文档顺序一致
+    _COLLECT_TEXTS_JS = """
+    return Array.from(this.querySelectorAll(arguments[0])).map(function(el) {
+        return (el.innerText || el.textContent || '');
+    });
+    """
+
+    def _texts_of(self, container, css: str) -> list[str]:
+        """只需文本时直接一次 JS 读出，不为每个元素建立句柄；JS 失败时退回逐个读取。"""
+        try:
+            texts = container.run_js(self._COLLECT_TEXTS_JS, css)
+            if isinstance(texts, list):
+                return texts
+        except Exception:
+            pass
+        return [txt for txt, _ in self._eles_with_texts(container, css)]
+
+    def _eles_with_texts(self, container, css: str, timeout: float | None = None) -> list:
+        """返回 [(文本, 元素)]：文本在浏览器内批量读取，避免逐个 .text 往返。"""
+        items = container.eles(f'css:{css}', timeout=timeout) or []
+        if not items:
+            return []
+        try:
+            texts = container.run_js(self._COLLECT_TEXTS_JS, css)
+        except Exception:
+            texts = None
+        if not isinstance(texts, list) or len(texts) != len(items):
+            texts = [it.text or '' for it in items]
+        return list(zip(texts, items))
+
     def _open_template_term_dropdown(self, iframe):
         """安全打开 Template Term 下拉框，仅允许点击字段自身触发器。"""
         trigger = self._find_template_term_trigger(iframe)
@@ -2765,7 +3071,11 @@ class ProposalSender:
                 logger.debug(f"点击 Template Term 触发器失败: {e}")
                 return None
 
-        time.sleep(0.2)
+        wait_for_js(
+            iframe,
+            "document.querySelector('div[data-testid=\"uicl-dropdown\"], div.iui-dropdown, ul[role=\"listbox\"]') !== null",
+            timeout=1.0,
+        )
         return self._get_visible_template_term_dropdown(iframe)
     
     def _get_template_term_options(self, iframe) -> list[str]:
@@ -2786,18 +3096,14 @@ class ProposalSender:
                 return []
             
             if dropdown:
-                # 先尝试获取 li[@role="option"] 元素
-                items = dropdown.eles('xpath:.//li[@role="option"]')
-                for it in items or []:
-                    txt = it.text or ''
+                # 这里只需要文本：先尝试 li[@role="option"]，没有再取 div.text-ellipsis；
+                # 两者常是嵌套关系，合并成并集查询会把同一选项读出两遍
+                for txt in self._texts_of(dropdown, 'li[role="option"]'):
                     if txt.strip():
                         options_list.append(txt.strip())
                 
-                # 如果没有找到，尝试获取 div.text-ellipsis 元素
                 if not options_list:
-                    nodes = dropdown.eles('css:div.text-ellipsis')
-                    for it in nodes or []:
-                        txt = it.text or ''
+                    for txt in self._texts_of(dropdown, 'div.text-ellipsis'):
                         if txt.strip():
                             options_list.append(txt.strip())
             
@@ -2806,9 +3112,11 @@ class ProposalSender:
                 term_dropdown = iframe.ele('css:select[data-testid="uicl-select"]', timeout=2)
                 if term_dropdown:
                     try:
-                        option_elements = term_dropdown.eles('css:option')
-                        for opt in option_elements or []:
-                            txt = opt.text or opt.attr('value') or ''
+                        # 一次 JS 读出全部 <option> 的文本（无文本时取 value）
+                        texts = term_dropdown.run_js(
+                            "return Array.from(this.options).map(function(o) { return o.text || o.value || ''; });"
+                        )
+                        for txt in texts or []:
                             if txt.strip():
                                 options_list.append(txt.strip())
                     except Exception:
@@ -2818,7 +3126,7 @@ class ProposalSender:
             seen = set()
             unique_options = []
             for opt in options_list:
-                norm = re.sub(r'\s+', ' ', opt).strip().lower()
+                norm = _norm_term(opt)
                 if norm not in seen:
                     seen.add(norm)
                     unique_options.append(opt)
@@ -2829,23 +3137,43 @@ class ProposalSender:
             logger.error(f"获取 Template Term 选项失败: {e}")
             return []
 
+    def _after_template_term_selected(self, label: str, iframe=None) -> bool:
+        """原生 <select> 与自定义下拉两条路径选中后的统一收尾。
+
+        自定义下拉传入 iframe：等到下拉浮层收起即继续，不再固定等待 0.3s；
+        原生 <select> 的 select() 是同步的，无需等待。
+        """
+        logger.info(f"已选择 Template Term: {label}")
+        if iframe is not None:
+            wait_for_js(iframe, DROPDOWN_CLOSED_JS, timeout=0.5)
+        return True
+
     def _select_template_term(self, iframe, term_text: str = "Commission Tier Terms") -> bool:
         """选择 Template Term"""
         try:
             desired = (term_text or "Commission Tier Terms").strip()
-            desired_norm = re.sub(r'\s+', ' ', desired).strip().lower()
+            desired_norm = _norm_term(desired)
             logger.debug(f"匹配 Template Term: desired='{desired}', desired_norm='{desired_norm}'")
             term_sim_threshold = 0.72
             term_sim_tie_eps = 0.005
 
-            term_dropdown = iframe.ele('css:select[data-testid="uicl-select"]', timeout=2)
+            # 当前 Impact 弹窗用的是自定义下拉，原生 <select> 仅作兼容；
+            # 弹窗内容已由 _wait_for_modal_iframe 等到就绪，这里短超时即可，避免每个弹窗白等
+            term_dropdown = iframe.ele('css:select[data-testid="uicl-select"]', timeout=0.5)
             
             if term_dropdown:
+                # 页面已预选为目标值时跳过 select()，省去一次写入和 change 事件派发
+                try:
+                    current = term_dropdown.run_js(
+                        "var o = this.options[this.selectedIndex]; return o ? (o.text || o.value || '') : '';"
+                    )
+                    if current and _norm_term(current) == desired_norm:
+                        return self._after_template_term_selected(desired)
+                except Exception:
+                    pass
                 try:
                     term_dropdown.select(desired)
-                    logger.info(f"已选择 Template Term: {desired}")
-                    time.sleep(0.3)
-                    return True
+                    return self._after_template_term_selected(desired)
                 except Exception as e:
                     logger.warning(f"<select> 选择 Template Term 失败，尝试自定义下拉: {e}")
 
@@ -2853,23 +3181,17 @@ class ProposalSender:
 
             if dropdown:
                 options = []
-                # 优先从 listbox 中获取选项
-                listbox = dropdown.ele('css:ul[role="listbox"]', timeout=0.5)
-                if listbox:
-                    items = listbox.eles('css:li')
-                else:
-                    items = dropdown.eles('xpath:.//li[@role="option"]')
-
-                for it in items or []:
-                    txt = it.text or ''
-                    txtn = re.sub(r'\s+', ' ', txt).strip().lower()
+                # 优先从 listbox 中获取选项：后代选择器一次取到选项，不必先单独定位 listbox；
+                # 否则依次尝试 li[role=option] 与 div.text-ellipsis，前者命中时不再查后者
+                items = self._eles_with_texts(dropdown, 'ul[role="listbox"] li', timeout=0.5)
+                if not items:
+                    items = self._eles_with_texts(dropdown, 'li[role="option"]')
+                if not items:
+                    items = self._eles_with_texts(dropdown, 'div.text-ellipsis')
+
+                for txt, it in items:
+                    txtn = _norm_term(txt)
                     options.append((txt, txtn, it))
-                if not options:
-                    nodes = dropdown.eles('css:div.text-ellipsis')
-                    for it in nodes or []:
-                        txt = it.text or ''
-                        txtn = re.sub(r'\s+', ' ', txt).strip().lower()
-                        options.append((txt, txtn, it))
 
                 # 去重：避免 DOM 中相同显示文本的重复节点，但保留 "(1)/(2)" 这类明确值
                 seen_norm = set()
@@ -2890,14 +3212,13 @@ class ProposalSender:
                         elem.click()
                     except Exception:
                         elem.click(by_js=True)
-                    if persist_choice:
+                    # 仅在用户手动挑选且结果与当前配置不同时才写盘
+                    if persist_choice and picked_label != self.template_term:
                         settings = self.config.load_settings()
                         settings['template_term'] = picked_label
                         self.config.save_settings(settings)
                         self.template_term = picked_label
-                    logger.info(f"已选择 Template Term: {picked_label}")
-                    time.sleep(0.3)
-                    return True
+                    return self._after_template_term_selected(picked_label, iframe)
 
                 def _ask_choice(total: int):
                     sel = questionary.text(
@@ -2920,6 +3241,20 @@ class ProposalSender:
                     _, element, persist_label = candidates[picked_index]
                     return _click_term_row(element, persist_label, persist_choice=True)
 
+                # 同一批次各弹窗的选项列表通常完全相同：命中上次的自动匹配结果时直接点击，跳过相似度计算
+                match_key = (desired_norm, tuple(n for _, n, _ in options))
+                cached_idx = self._term_match_cache.get(match_key)
+                if cached_idx is not None:
+                    txt, _, ele = options[cached_idx]
+                    logger.debug(f"复用上次的 Template Term 匹配结果: {txt}")
+                    try:
+                        return _click_term_row(ele, txt)
+                    except Exception:
+                        self._term_match_cache.pop(match_key, None)
+                        raise
+
+                from difflib import SequenceMatcher
+
                 scored = [
                     (SequenceMatcher(None, desired_norm, n).ratio(), t, e) for (t, n, e) in options
                 ]
@@ -2931,6 +3266,9 @@ class ProposalSender:
                     top = [s for s in scored if s[0] >= best_score - term_sim_tie_eps]
                     logger.debug(f"匹配成功，最佳得分 {best_score:.3f} ≥ 阈值 {term_sim_threshold}，找到 {len(top)} 个候选项")
                     if len(top) == 1:
+                        self._term_match_cache[match_key] = next(
+                            i for i, (_, _, e) in enumerate(options) if e is top[0][2]
+                        )
                         return _click_term_row(top[0][2], top[0][1])
                     top_candidates = [
                         (f"{t}  [dim](相似度 {best_score:.2f})[/dim]", e, t)
@@ -2962,8 +3300,8 @@ class ProposalSender:
     def _normalize_partner_group_text(self, text: str) -> str:
         """规范化 Partner Group 文本用于匹配。"""
         raw = text or ""
-        raw = re.sub(r'\s*\(\d+\)\s*$', '', raw)
-        raw = re.sub(r'\s+', '', raw)
+        raw = _TAG_COUNT_RE.sub('', raw)
+        raw = _WHITESPACE_RE.sub('', raw)
         return raw.strip().lower()
 
     def _calc_text_similarity(self, text1: str, text2: str) -> float:
@@ -3062,37 +3400,38 @@ class ProposalSender:
     ) -> list[tuple[str, str, object]]:
         """读取 Partner Group 下拉选项，返回 (显示文本, 规范化文本, 元素)。"""
         # 注意：class 名如 _4-15-1_Baf2T、_4-48-2_Baf2T 是动态生成的，使用 [class*="Baf2T"] 匹配
-        # xpath://ul/li/div/div 对应用户提供的结构 @/html/body/div[12]/div/div/ul/li/div/div
+        # ul > li > div > div 对应用户提供的结构 @/html/body/div[12]/div/div/ul/li/div/div
+        # 各 selector 的节点文本由 _eles_with_texts 一次 JS 批量读取，避免逐个 .text 往返
         selectors = [
-            'css:li[role="option"]',
-            'css:div[role="option"]',
-            'css:[class*="Baf2T"]',
-            'xpath://ul/li/div/div',  # 用户提供的 XPath 模式（简化为相对路径）
-            'css:li',
+            'li[role="option"]',
+            'div[role="option"]',
+            '[class*="Baf2T"]',
+            'ul > li > div > div',
+            'li',
         ]
         options: list[tuple[str, str, object]] = []
         seen: set[str] = set()
 
+        def _collect(items) -> None:
+            for raw, node in items:
+                text = (raw or "").strip()
+                if not text:
+                    continue
+                norm_text = self._normalize_partner_group_text(text)
+                key = f"{norm_text}::{text}"
+                if key in seen:
+                    continue
+                seen.add(key)
+                options.append((text, norm_text, node))
+
         for selector in selectors:
             try:
-                nodes = dropdown.eles(selector, timeout=0.2)
+                items = self._eles_with_texts(dropdown, selector, timeout=0.2)
             except Exception:
-                nodes = []
-            if self.partner_groups_debug_logging and nodes:
-                logger.info(f"[PartnerGroupsDebug] Selector '{selector}' 找到 {len(nodes)} 个节点")
-            for node in nodes or []:
-                try:
-                    text = (node.text or "").strip()
-                    if not text:
-                        continue
-                    norm_text = self._normalize_partner_group_text(text)
-                    key = f"{norm_text}::{text}"
-                    if key in seen:
-                        continue
-                    seen.add(key)
-                    options.append((text, norm_text, node))
-                except Exception:
-                    continue
+                items = []
+            if self.partner_groups_debug_logging and items:
+                logger.info(f"[PartnerGroupsDebug] Selector '{selector}' 找到 {len(items)} 个节点")
+            _collect(items)
             if options:
                 break
 
@@ -3100,22 +3439,10 @@ class ProposalSender:
         # 取有可见文本的元素作为候选项，按规范化文本+原始文本去重。
         if not options:
             try:
-                nodes = dropdown.eles('xpath:.//*', timeout=0.2)
+                _collect(self._eles_with_texts(dropdown, '*', timeout=0.2))
             except Exception:
-                nodes = []
-            for node in nodes or []:
-                try:
-                    text = (node.text or "").strip()
-                    if not text:
-                        continue
-                    norm_text = self._normalize_partner_group_text(text)
-                    key = f"{norm_text}::{text}"
-                    if key in seen:
-                        continue
-                    seen.add(key)
-                    options.append((text, norm_text, node))
-                except Exception:
-                    continue
+                pass
+
         should_log = (
             self.partner_groups_debug_logging
             if emit_debug_log is None
@@ -3166,7 +3493,7 @@ class ProposalSender:
             if not base_container:
                 # 兜底：用 input 的父节点作为容器
                 try:
-                    input_ele = iframe.ele('css:input[data-testid="uicl-tag-input-text-input"]', timeout=0.8)
+                    input_ele = self._modal_ele(iframe, TAG_INPUT_SELECTOR, timeout=0.8)
                     if input_ele:
                         base_container = input_ele.parent()
                 except Exception:
@@ -3199,7 +3526,7 @@ class ProposalSender:
                     break
 
             try:
-                input_ele2 = iframe.ele('css:input[data-testid="uicl-tag-input-text-input"]', timeout=0.6)
+                input_ele2 = self._modal_ele(iframe, TAG_INPUT_SELECTOR, timeout=0.6)
             except Exception:
                 input_ele2 = None
             if input_ele2:
@@ -3371,7 +3698,7 @@ class ProposalSender:
 
         def _get_tag_input_value() -> str:
             try:
-                inp = iframe.ele('css:input[data-testid="uicl-tag-input-text-input"]', timeout=0.2)
+                inp = self._modal_ele(iframe, TAG_INPUT_SELECTOR, timeout=0.2)
             except Exception:
                 inp = None
             if not inp:
@@ -3386,11 +3713,11 @@ class ProposalSender:
             dropdown_ele = dropdown
             if not dropdown_ele:
                 try:
-                    dropdown_ele = iframe.ele('css:[data-testid="uicl-tag-input-dropdown"]', timeout=0.3)
+                    dropdown_ele = iframe.ele(TAG_INPUT_DROPDOWN_SELECTOR, timeout=0.3)
                 except Exception:
                     try:
-                        tag_input = iframe.ele('css:input[data-testid="uicl-tag-input-text-input"]', timeout=0.2)
-                        dropdown_ele = tag_input.ele('xpath:ancestor::*[@data-testid="uicl-tag-input"][1]', timeout=0.2)
+                        tag_input = self._modal_ele(iframe, TAG_INPUT_SELECTOR, timeout=0.2)
+                        dropdown_ele = tag_input.ele(TAG_INPUT_CONTAINER_XPATH, timeout=0.2)
                     except Exception:
                         dropdown_ele = None
 
@@ -3437,7 +3764,7 @@ class ProposalSender:
                 if self._verify_partner_group_selected(iframe, target_norm, emit_failure_log=False):
                     # 验证通过：chip 已存在，主动清空输入框（防止组件未自动清空）
                     try:
-                        inp = iframe.ele('css:input[data-testid="uicl-tag-input-text-input"]', timeout=0.2)
+                        inp = self._modal_ele(iframe, TAG_INPUT_SELECTOR, timeout=0.2)
                         if inp:
                             # 使用 JS 清空输入框，确保干净
                             inp.run_js("this.value=''; this.dispatchEvent(new Event('input', {bubbles:true}));")
@@ -3524,6 +3851,20 @@ class ProposalSender:
 
         return False
 
+    # tag-input 下拉当前可见选项文本拼接，用于判断输入后下拉是否已刷新
+    _TAG_DROPDOWN_SIGNATURE_JS = """
+    var nodes = document.querySelectorAll(
+        '[data-testid="uicl-tag-input-dropdown"] li, [data-testid="uicl-tag-input"] li, [data-testid="uicl-tag-input"] [role="option"]'
+    );
+    return Array.from(nodes).map(function(n) { return n.textContent || ''; }).join('|');
+    """
+
+    def _tag_dropdown_signature(self, iframe) -> str | None:
+        try:
+            return iframe.run_js(self._TAG_DROPDOWN_SIGNATURE_JS)
+        except Exception:
+            return None
+
     def _apply_partner_group(self, iframe, selected_tab: str) -> None:
         """根据配置使用 UI 下拉或直连 API 设置 Partner Group。"""
         pg = getattr(self, "partner_groups", None) or {}
@@ -3543,7 +3884,7 @@ class ProposalSender:
     def _input_tag_and_select(self, iframe, selected_tab: str) -> bool:
         """在 tag-input 中逐字符输入，完整输入后出现唯一匹配时立即选中。"""
         try:
-            search_text = re.sub(r'\s+', '', selected_tab or "")
+            search_text = _WHITESPACE_RE.sub('', selected_tab or "")
             if not search_text:
                 raise Exception("selected_tab 为空，无法输入 Partner Group")
 
@@ -3551,7 +3892,7 @@ class ProposalSender:
             cache_key = target_norm
             cached_len = self._partner_group_prefix_len_cache.get(cache_key)
 
-            tag_input = iframe.ele('css:input[data-testid="uicl-tag-input-text-input"]', timeout=3)
+            tag_input = self._modal_ele(iframe, TAG_INPUT_SELECTOR, timeout=3)
             if not tag_input:
                 raise Exception("未找到 tag-input 输入框")
 
@@ -3563,8 +3904,8 @@ class ProposalSender:
             for input_len in input_lengths:
                 prefix = search_text[:input_len]
 
+                options_before = self._tag_dropdown_signature(iframe)
                 tag_input.click(by_js=True)
-                time.sleep(0.1)
                 tag_input.clear()
                 tag_input.input(prefix)
                 if self.partner_groups_debug_logging:
@@ -3575,21 +3916,26 @@ class ProposalSender:
                     )
                 else:
                     logger.debug(f"Partner Group 尝试输入前缀: '{prefix}' (长度={input_len})")
-                time.sleep(0.25)
+                # 下拉选项随输入过滤刷新；一旦选项集合变化即继续，最多等待原先的 0.25s
+                wait_until(
+                    lambda: self._tag_dropdown_signature(iframe) != options_before,
+                    timeout=0.25,
+                    interval=0.05,
+                )
 
                 # 兼容旧版和新版 UI：
                 # - 旧版存在独立的 [data-testid=\"uicl-tag-input-dropdown\"] 容器；
                 # - 新版下拉选项直接挂在 tag-input 容器内（data-testid=\"uicl-tag-input\"）。
                 dropdown = None
                 try:
-                    dropdown = iframe.ele('css:[data-testid=\"uicl-tag-input-dropdown\"]', timeout=1)
+                    dropdown = iframe.ele(TAG_INPUT_DROPDOWN_SELECTOR, timeout=1)
                 except Exception:
                     dropdown = None
 
                 # 优化：使用 xpath 直接查找祖先元素，代替循环 4 层 parent()
                 if not dropdown:
                     try:
-                        dropdown = tag_input.ele('xpath:ancestor::*[@data-testid="uicl-tag-input"][1]', timeout=0.3)
+                        dropdown = tag_input.ele(TAG_INPUT_CONTAINER_XPATH, timeout=0.3)
                     except Exception:
                         dropdown = None
 
@@ -3736,38 +4082,74 @@ class ProposalSender:
             logger.error(f"选择日期失败: {e}")
         return False
     
-    def _input_comment(self, iframe, template_content: str = "") -> bool:
-        """填写留言"""
+    def _input_comment(self, iframe, template_content: str | None = None) -> bool:
+        """填写留言。发送循环会在开始时解析一次模板并传入，此处仅在未传入时才读取模板。"""
         try:
-            template = template_content or self.template_manager.get_active_template()
+            if template_content is None:
+                template_content = self.template_manager.get_active_template()
+            template = template_content
             if not template:
-                logger.warning("留言模板为空")
                 logger.warning("留言模板为空")
                 return False
             
-            textarea = iframe.ele('css:textarea[data-testid="uicl-textarea"]', timeout=3)
+            textarea = iframe.ele(COMMENT_TEXTAREA_SELECTOR, timeout=3)
             if not textarea:
-                textarea = iframe.ele('css:textarea[name="comment"]', timeout=2)
-            
-            if not textarea:
-                logger.warning("未找到留言输入框")
                 logger.warning("未找到留言输入框")
                 return False
             
-            textarea.click(by_js=True)
-            time.sleep(0.2)
-            textarea.clear()
-            textarea.input(template)
-            logger.info("已填写留言内容")
+            if not self._set_field_value(textarea, template):
+                # 原生 setter 未生效时回退为逐字输入
+                textarea.clear()
+                textarea.input(template)
             logger.info("已填写留言内容")
-            time.sleep(0.3)
             return True
             
         except Exception as e:
             logger.error(f"填写留言失败: {e}")
-            logger.error(f"填写留言失败: {e}")
         return False
-    
+
+    # 通过原型上的原生 value setter 写值，React 受控组件才能感知到变化
+    _NATIVE_VALUE_SETTER_JS = """
+        this.focus();
+        var proto = Object.getPrototypeOf(this);
+        var desc = Object.getOwnPropertyDescriptor(proto, 'value');
+        if (desc && desc.set) {
+            desc.set.call(this, arguments[0]);
+        } else {
+            this.value = arguments[0];
+        }
+        this.dispatchEvent(new Event('input', {bubbles: true}));
+        this.dispatchEvent(new Event('change', {bubbles: true}));
+        return this.value === arguments[0];
+    """
+
+    def _set_field_value(self, ele, value: str) -> bool:
+        """一次 run_js 完成聚焦与写值（替代点击 + 逐字符 input），并回读校验是否生效。"""
+        try:
+            return bool(ele.run_js(self._NATIVE_VALUE_SETTER_JS, value))
+        except Exception as e:
+            logger.debug(f"原生 setter 写值失败，回退逐字输入: {e}")
+            return False
+
+    # JS 提交路径连续未命中达到该次数后，本会话内不再尝试，直接走 XPath 兜底
+    _SUBMIT_JS_MAX_MISSES = 3
+
+    # 在弹窗 iframe 内找到文本含 Send Proposal 的提交按钮并点击（优先 uicl-button）
+    _CLICK_SUBMIT_JS = """
+        function hasText(el) { return (el.innerText || el.textContent || '').indexOf('Send Proposal') !== -1; }
+        var btns = Array.prototype.filter.call(document.querySelectorAll('button[data-testid="uicl-button"]'), hasText);
+        if (!btns.length) { btns = Array.prototype.filter.call(document.querySelectorAll('button'), hasText); }
+        if (!btns.length) { return false; }
+        btns[0].click();
+        return true;
+    """
+
+    def _after_submit_clicked(self, iframe) -> bool:
+        # 确认按钮由 _click_understand_button 轮询等待出现，无需先固定 sleep
+        logger.info("已点击提交按钮")
+        self._click_understand_button(iframe)
+        return True
+
     def _submit_proposal(self, iframe) -> bool:
         """提交 Proposal"""
         try:
@@ -3779,30 +4161,22 @@ class ProposalSender:
                 self._close_modal(iframe)
                 return True
             
-            submit_btn = iframe.ele('css:button[data-testid="uicl-button"]', timeout=3)
-            if submit_btn and 'Send Proposal' in submit_btn.text:
-                submit_btn.click(by_js=True)
-                logger.info("已点击提交按钮")
-                time.sleep(1)
-                self._click_understand_button(iframe)
-                return True
-            
-            submit_btn = iframe.ele('text:Send Proposal', timeout=2)
-            if submit_btn and submit_btn.tag == 'button':
-                submit_btn.click(by_js=True)
-                logger.info("已点击提交按钮")
-                time.sleep(1)
-                self._click_understand_button(iframe)
-                return True
-            
-            buttons = iframe.eles('css:button[data-testid="uicl-button"]')
-            for btn in buttons:
-                if 'Send Proposal' in btn.text:
-                    btn.click(by_js=True)
-                    logger.info("已点击提交按钮")
-                    time.sleep(1)
-                    self._click_understand_button(iframe)
-                    return True
+            # 优先一次 JS 完成查找 + 点击；失败再走逐个元素查找的兜底。
+            # 一次未命中可能只是弹窗还没渲染完，JS 路径连续多次未命中才在本会话内停用
+            if self._submit_js_misses < self._SUBMIT_JS_MAX_MISSES:
+                try:
+                    if iframe.run_js(self._CLICK_SUBMIT_JS):
+                        self._submit_js_misses = 0
+                        return self._after_submit_clicked(iframe)
+                except Exception as e:
+                    logger.debug(f"JS 点击提交按钮失败，回退逐个查找: {e}")
+                self._submit_js_misses += 1
+
+            # 兜底只做一次 XPath 查询，文本过滤在浏览器内完成，只有命中的按钮会跨 CDP 返回
+            btn = iframe.ele(SEND_PROPOSAL_BUTTON_XPATH, timeout=3)
+            if btn:
+                btn.click(by_js=True)
+                return self._after_submit_clicked(iframe)
             
             logger.warning("未找到提交按钮")
             return False
@@ -3814,7 +4188,16 @@ class ProposalSender:
     def _close_modal(self, iframe) -> bool:
         """关闭弹窗（用于 dry_run 模式）"""
         try:
-            # 尝试点击关闭按钮
+            # 优先按 ESC：多数弹窗直接响应，无需先等待关闭按钮的元素查找
+            try:
+                self.browser.tab.actions.key_down('Escape').key_up('Escape').perform()
+                if wait_for_js(self.browser.tab, MODAL_CLOSED_JS, timeout=0.3):
+                    logger.info("[DRY-RUN] 已按 ESC 关闭弹窗")
+                    return True
+            except Exception:
+                pass
+
+            # 备用：尝试点击关闭按钮
             close_btn = self.browser.find_element(
                 'css:button[data-testid="uicl-icon-button"]',
                 timeout=1,
@@ -3823,26 +4206,17 @@ class ProposalSender:
             if close_btn:
                 self.browser.click(close_btn, by_js=True)
                 logger.info("[DRY-RUN] 已关闭弹窗")
-                time.sleep(0.5)
+                wait_for_js(self.browser.tab, MODAL_CLOSED_JS, timeout=0.5)
                 return True
             
-            # 备用：尝试点击 Cancel 按钮
+            # 再备用：尝试点击 Cancel 按钮
             cancel_btn = iframe.ele('text:Cancel', timeout=1)
             if cancel_btn and cancel_btn.tag == 'button':
                 cancel_btn.click(by_js=True)
                 logger.info("[DRY-RUN] 已点击 Cancel 关闭弹窗")
-                time.sleep(0.5)
+                wait_for_js(self.browser.tab, MODAL_CLOSED_JS, timeout=0.5)
                 return True
             
-            # 再备用：按 ESC 键
-            try:
-                self.browser.tab.actions.key_down('Escape').key_up('Escape').perform()
-                logger.info("[DRY-RUN] 已按 ESC 关闭弹窗")
-                time.sleep(0.5)
-                return True
-            except Exception:
-                pass
-            
             logger.warning("[DRY-RUN] 未能自动关闭弹窗，请手动关闭")
             return False
             
@@ -3850,31 +4224,68 @@ class ProposalSender:
             logger.warning(f"[DRY-RUN] 关闭弹窗失败: {e}")
         return False
     
+    def _first_found(self, probes: list, timeout: float, step: float = 0.5):
+        """在调用线程内依次轮询多个元素探测，返回最先命中的结果。
+
+        probes 为接收超时秒数的可调用对象，共用同一个截止时间；多个探测时每轮每个最多等 step 秒，
+        任一位置先出现都能在截止前找到。不开后台线程，避免主流程点击时仍有探测在同一 tab/iframe 上发 CDP 请求。
+        """
+        if not probes:
+            return None
+        deadline = time.monotonic() + timeout
+        per_probe = timeout if len(probes) == 1 else step
+        while True:
+            for probe in probes:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                try:
+                    found = probe(min(per_probe, remaining))
+                except Exception:
+                    continue
+                if found:
+                    return found
+
     def _click_understand_button(self, iframe) -> bool:
         """点击确认按钮"""
         try:
-            time.sleep(0.5)
-            
-            understand_btn = self.browser.find_element('text:I understand', timeout=3, parent=iframe)
-            if understand_btn and understand_btn.tag == 'button':
-                self.browser.click(understand_btn, by_js=True)
-                logger.info("已点击 'I understand' 确认按钮")
-                time.sleep(0.5)
-                return True
-            
-            buttons = self.browser.find_elements('css:button[data-testid="uicl-button"]', parent=iframe)
-            for btn in buttons:
-                if btn and 'I understand' in (btn.text or ''):
-                    self.browser.click(btn, by_js=True)
-                    logger.info("已点击 'I understand' 确认按钮")
-                    time.sleep(0.5)
-                    return True
-            
-            understand_btn = self.browser.find_element('text:I understand', timeout=2)
-            if understand_btn and understand_btn.tag == 'button':
+            # 同一条 XPath 已限定 button 并在浏览器内按文本过滤，无需再读 tag 校验；
+            # iframe 内只需一个探测，另一个覆盖确认框渲染在列表页的情况
+            def _in_iframe(timeout):
+                return iframe.ele(UNDERSTAND_BUTTON_XPATH, timeout=timeout) or None
+
+            def _in_page(timeout):
+                return self.browser.find_element(UNDERSTAND_BUTTON_XPATH, timeout=timeout) or None
+
+            probes = {
+                'iframe': _in_iframe,
+                'page': _in_page,
+            }
+
+            def _tagged(name):
+                def _probe(timeout):
+                    btn = probes[name](timeout)
+                    return (name, btn) if btn else None
+                return _probe
+
+            # 已知命中策略时只跑该策略；未命中再轮询其余策略（此时弹窗早已渲染，短超时即可）
+            preferred = self._understand_probe
+            if preferred in probes:
+                found = self._first_found([_tagged(preferred)], timeout=3.0)
+                if not found:
+                    found = self._first_found([_tagged(n) for n in probes if n != preferred], timeout=1.0)
+            else:
+                found = self._first_found([_tagged(n) for n in probes], timeout=3.0)
+
+            understand_btn = None
+            if found:
+                self._understand_probe, understand_btn = found
+            if understand_btn:
                 self.browser.click(understand_btn, by_js=True)
                 logger.info("已点击 'I understand' 确认按钮")
-                time.sleep(0.5)
+                # 等弹窗 iframe 从列表页移除再返回，避免下一个按钮误拿到正在关闭的旧弹窗
+                if not wait_for_js(self.browser.tab, MODAL_CLOSED_JS, timeout=1.0, interval=0.05):
+                    logger.debug("确认后 1 秒内弹窗 iframe 仍在页面上")
                 return True
             
             logger.warning("未找到 'I understand' 按钮")
@@ -3890,7 +4301,7 @@ class ProposalSender:
         start_time = time.time()
         while time.time() < deadline:
             iframe = self.browser.find_element(
-                'css:iframe[data-testid="uicl-modal-iframe-content"]',
+                MODAL_IFRAME_SELECTOR,
                 timeout=0.5
             )
             if iframe:
@@ -3903,23 +4314,188 @@ class ProposalSender:
         logger.warning(f"等待 Proposal 弹窗超时（等待了 {elapsed:.2f} 秒，超时设置: {self.modal_wait_timeout} 秒）")
         return None
 
+    # 一次调用读出按钮的已点击/已计数标记并顺手打上计数标记，同时取出所在卡片的 selected-tab 文本
+    _CLASSIFY_BUTTON_JS = """
+    var tab = null;
+    for (var el = this.parentElement; el; el = el.parentElement) {
+        var sel = el.querySelector('.selected-tab');
+        if (sel) { tab = (sel.innerText || sel.textContent || '').trim(); break; }
+    }
+    if (this.getAttribute(arguments[0]) === 'true') { return ['clicked', tab]; }
+    if (this.getAttribute(arguments[1]) === 'true') { return ['counted', tab]; }
+    this.setAttribute(arguments[1], 'true');
+    return ['new', tab];
+    """
+
+    # 一次页面级调用完成按钮收集、分配稳定序号、分类与 selected-tab 读取；
+    # 按钮查找顺序与 _find_send_proposal_buttons 的兜底策略一致
+    _TAG_SEND_PROPOSAL_BUTTONS_JS = """
+    var idxAttr = arguments[0], clickedAttr = arguments[1], countedAttr = arguments[2];
+    // 每轮都校验文本：虚拟列表会复用节点，带旧序号的节点可能已换成别的内容
+    function hasText(el) { return (el.innerText || el.textContent || '').indexOf('Send Proposal') !== -1; }
+    function pick(sel) { return Array.prototype.filter.call(document.querySelectorAll(sel), hasText); }
+    var btns = pick('button[data-testid="uicl-button"]');
+    if (!btns.length) { btns = pick('button'); }
+    if (!btns.length) { btns = pick('[role="button"]'); }
+    var next = window.__impactRpaButtonSeq || 0;
+    var out = [];
+    btns.forEach(function (b) {
+        if (!b.hasAttribute(idxAttr)) { b.setAttribute(idxAttr, String(next++)); }
+        // 已点击的按钮只需回报状态，跳过向上查找 selected-tab 的祖先遍历
+        if (b.getAttribute(clickedAttr) === 'true') { out.push([b.getAttribute(idxAttr), 'clicked', null]); return; }
+        var tab = null;
+        for (var el = b.parentElement; el; el = el.parentElement) {
+            var sel = el.querySelector('.selected-tab');
+            if (sel) { tab = (sel.innerText || sel.textContent || '').trim(); break; }
+        }
+        var state;
+        if (b.getAttribute(countedAttr) === 'true') { state = 'counted'; }
+        else { b.setAttribute(countedAttr, 'true'); state = 'new'; }
+        out.push([b.getAttribute(idxAttr), state, tab]);
+    });
+    window.__impactRpaButtonSeq = next;
+    return JSON.stringify(out);
+    """
+
+    def _collect_button_entries(self) -> list[tuple[str, str, str | None]]:
+        """返回当前页面 Send Proposal 按钮的 [(序号, 状态, selected-tab)]。
+        
+        优先一次 JS 完成；失败时退回逐个句柄查找与分类，并由 Python 侧分配序号。
+        """
+        try:
+            result = self.browser.tab.run_js(
+                self._TAG_SEND_PROPOSAL_BUTTONS_JS, self.index_attr, self.clicked_attr, self.counted_attr
+            )
+            if isinstance(result, str):
+                # 嵌套数组经 CDP 返回时每层都要单独取回，序列化成一个字符串只需一次往返
+                rows = json.loads(result)
+                return [(str(r[0]), r[1], r[2] or None) for r in rows if isinstance(r, list) and len(r) == 3]
+        except Exception as e:
+            logger.debug(f"批量标记 Send Proposal 按钮失败，退回逐个查找: {e}")
+
+        entries = []
+        for btn in self._find_send_proposal_buttons():
+            idx = btn.attr(self.index_attr)
+            if not idx:
+                self._button_seq += 1
+                idx = f"py{self._button_seq}"
+                if not self._mark_button_state(btn, self.index_attr, idx):
+                    continue
+            state, selected_tab = self._classify_button(btn)
+            entries.append((idx, state, selected_tab))
+        return entries
+
+    def _button_by_index(self, idx: str):
+        return self.browser.find_element(f'css:[{self.index_attr}="{idx}"]', timeout=0.5)
+
+    def _classify_button(self, button) -> tuple[str, str | None]:
+        """返回 (状态, selected-tab)。状态为 'clicked' | 'counted' | 'new' | 'mark_failed'，
+        'new' 表示本次刚打上计数标记；selected-tab 未能批量取到时为 None。"""
+        try:
+            result = button.run_js(self._CLASSIFY_BUTTON_JS, self.clicked_attr, self.counted_attr)
+            if isinstance(result, (list, tuple)) and len(result) == 2 and result[0] in ('clicked', 'counted', 'new'):
+                return result[0], (result[1] or None)
+        except Exception:
+            pass
+        if button.attr(self.clicked_attr) == 'true':
+            return 'clicked', None
+        if button.attr(self.counted_attr) == 'true':
+            return 'counted', None
+        return ('new' if self._mark_button_state(button, self.counted_attr) else 'mark_failed'), None
+
+    # 按序号批量为按钮打上已点击标记，返回实际找到并标记的序号
+    _MARK_CLICKED_BY_INDEX_JS = """
+    var idxAttr = arguments[0], attr = arguments[1], ids = arguments[2], done = [];
+    ids.forEach(function (id) {
+        var el = document.querySelector('[' + idxAttr + '="' + id + '"]');
+        if (el) { el.setAttribute(attr, 'true'); done.push(id); }
+    });
+    return done;
+    """
+
+    def _mark_clicked_by_index(self, indices: list[str]) -> list[str] | None:
+        """一次 JS 调用批量标记已点击；失败返回 None，由调用方逐个处理。"""
+        if not indices:
+            return []
+        try:
+            result = self.browser.tab.run_js(
+                self._MARK_CLICKED_BY_INDEX_JS, self.index_attr, self.clicked_attr, list(indices)
+            )
+        except Exception as e:
+            logger.debug(f"批量标记已点击失败，退回逐个标记: {e}")
+            return None
+        return [str(i) for i in result] if isinstance(result, list) else None
+
     def _mark_button_state(self, button, attr: str, value: str = "true") -> bool:
-        """为按钮设置指定的 DOM 属性标记"""
+        """为按钮设置指定的 DOM 属性标记（一次 run_js，无需先读再写）"""
         try:
-            current = button.attr(attr)
-            if current == value:
-                return True
-            button.attr(attr, value)
+            button.run_js('this.setAttribute(arguments[0], arguments[1]);', attr, value)
             return True
-        except Exception:
-            try:
-                button.run_js(f'this.setAttribute("{attr}", "{value}")')
-                return True
-            except Exception as e:
-                logger.debug(f"设置按钮属性 {attr} 失败: {e}")
+        except Exception as e:
+            logger.debug(f"设置按钮属性 {attr} 失败: {e}")
         return False
 
 
+# 静态菜单的选项与样式只构建一次；模板列表等动态菜单仍在调用时按需构建
+_CYAN_MENU_STYLE = questionary.Style([
+    ('highlighted', 'fg:cyan bold'),
+    ('pointer', 'fg:cyan bold'),
+])
+_YELLOW_MENU_STYLE = questionary.Style([
+    ('highlighted', 'fg:yellow bold'),
+    ('pointer', 'fg:yellow bold'),
+])
+# 主菜单标题内容固定，Panel 只构建一次，每轮循环直接复用
+_MAIN_MENU_HEADER = Panel.fit(
+    "[bold cyan]Impact RPA - Send Proposal 自动化工具[/bold cyan]",
+    border_style="cyan"
+)
+_MAIN_MENU_CHOICES = [
+    questionary.Choice("🚀 开始发送 Send Proposal", value="1"),
+    questionary.Choice("📋 Creator Search 批量发送", value="8"),
+    questionary.Choice("📄 预览当前留言模板", value="2"),
+    questionary.Choice("✏️  编辑留言模板", value="3"),
+    questionary.Choice("🔢 设置发送数量", value="4"),
+    questionary.Choice("⚙️  查看当前设置", value="5"),
+    questionary.Choice("🔧 设置 Template Term 下拉选项", value="6"),
+    questionary.Choice("🏷️  设置是否输入 Partner Groups 标签", value="9"),
+    questionary.Choice("🔄 检查并更新代码", value="7"),
+    questionary.Choice("🚪  退出程序", value="0"),
+]
+_EDIT_MENU_CHOICES = [
+    questionary.Choice("📋 查看所有模板", value="list"),
+    questionary.Choice("👁️  预览当前模板", value="preview"),
+    questionary.Choice("✅ 选择激活模板", value="select"),
+    questionary.Choice("➕ 添加新模板", value="add"),
+    questionary.Choice("✏️  编辑模板", value="edit"),
+    questionary.Choice("🗑️  删除模板", value="delete"),
+    questionary.Choice("🔙 返回主菜单", value="back"),
+]
+# 各选择菜单末尾共用的“取消”项（返回 None）
+_CANCEL_CHOICE = questionary.Choice("🔙 取消", value=None)
+_EDIT_FIELD_CHOICES = [
+    questionary.Choice("📝 编辑名称", value="name"),
+    questionary.Choice("📄 编辑内容", value="content"),
+    _CANCEL_CHOICE,
+]
+_INPUT_METHOD_CHOICES = [
+    questionary.Choice("📋 从剪贴板粘贴", value="clipboard"),
+    questionary.Choice("⌨️  手动输入（输入 END 结束）", value="manual"),
+    questionary.Choice("🔙 取消", value="cancel"),
+]
+_TEMPLATE_TERM_METHOD_CHOICES = [
+    questionary.Choice("⌨️  手动输入", value="manual"),
+    questionary.Choice("🌐 从浏览器弹窗获取选项列表", value="browser"),
+    questionary.Choice("🔙 取消", value="cancel"),
+]
+_PARTNER_GROUPS_MODE_CHOICES = [
+    questionary.Choice("✅ 网页输入并下拉选择", value="ui"),
+    questionary.Choice("🌐 直连接口（在 settings.json 的 partner_groups.api 填写 Reqable 抓到的 URL/Body）", value="api"),
+    questionary.Choice("🚫 跳过", value="skip"),
+    _CANCEL_CHOICE,
+]
+
+
 class MenuUI:
     """用户界面类，负责菜单显示和用户交互"""
     
@@ -3939,31 +4515,12 @@ class MenuUI:
     
     def show_main_menu(self) -> str | None:
         """显示主菜单"""
-        self.console.print(Panel.fit(
-            "[bold cyan]Impact RPA - Send Proposal 自动化工具[/bold cyan]",
-            border_style="cyan"
-        ))
-        
-        choices = [
-            questionary.Choice("🚀 开始发送 Send Proposal", value="1"),
-            questionary.Choice("📋 Creator Search 批量发送", value="8"),
-            questionary.Choice("📄 预览当前留言模板", value="2"),
-            questionary.Choice("✏️  编辑留言模板", value="3"),
-            questionary.Choice("🔢 设置发送数量", value="4"),
-            questionary.Choice("⚙️  查看当前设置", value="5"),
-            questionary.Choice("🔧 设置 Template Term 下拉选项", value="6"),
-            questionary.Choice("🏷️  设置是否输入 Partner Groups 标签", value="9"),
-            questionary.Choice("🔄 检查并更新代码", value="7"),
-            questionary.Choice("🚪  退出程序", value="0"),
-        ]
+        self.console.print(_MAIN_MENU_HEADER)
         
         return questionary.select(
             "请选择操作:",
-            choices=choices,
-            style=questionary.Style([
-                ('highlighted', 'fg:cyan bold'),
-                ('pointer', 'fg:cyan bold'),
-            ])
+            choices=_MAIN_MENU_CHOICES,
+            style=_CYAN_MENU_STYLE,
         ).ask()
     
     def preview_template(self):
@@ -3985,23 +4542,10 @@ class MenuUI:
     def edit_template_menu(self):
         """模板编辑菜单"""
         while True:
-            choices = [
-                questionary.Choice("📋 查看所有模板", value="list"),
-                questionary.Choice("👁️  预览当前模板", value="preview"),
-                questionary.Choice("✅ 选择激活模板", value="select"),
-                questionary.Choice("➕ 添加新模板", value="add"),
-                questionary.Choice("✏️  编辑模板", value="edit"),
-                questionary.Choice("🗑️  删除模板", value="delete"),
-                questionary.Choice("🔙 返回主菜单", value="back"),
-            ]
-            
             choice = questionary.select(
                 "模板管理:",
-                choices=choices,
-                style=questionary.Style([
-                    ('highlighted', 'fg:yellow bold'),
-                    ('pointer', 'fg:yellow bold'),
-                ])
+                choices=_EDIT_MENU_CHOICES,
+                style=_YELLOW_MENU_STYLE,
             ).ask()
             
             if choice is None or choice == 'back':
@@ -4040,7 +4584,8 @@ class MenuUI:
             tpl_id = tpl.get('id', 0)
             name = tpl.get('name', '未命名')
             content = tpl.get('content', '')
-            preview = content.replace('\n', ' ')[:50]
+            # 先截断再替换换行，避免对整段长文本做拷贝
+            preview = content[:50].replace('\r', ' ').replace('\n', ' ')
             if len(content) > 50:
                 preview += "..."
             
@@ -4061,18 +4606,20 @@ class MenuUI:
             return
         
         choices = []
+        by_id = {}
         for tpl in templates:
             tpl_id = tpl.get('id', 0)
+            by_id[tpl_id] = tpl
             name = tpl.get('name', '未命名')
             mark = " ✓" if tpl_id == active_id else ""
             choices.append(questionary.Choice(f"{name}{mark}", value=tpl_id))
-        choices.append(questionary.Choice("🔙 取消", value=None))
+        choices.append(_CANCEL_CHOICE)
         
         selected = questionary.select("选择要激活的模板:", choices=choices).ask()
         
         if selected is not None:
             if self.template_manager.set_active(selected):
-                name = next((t.get('name', '未命名') for t in templates if t.get('id') == selected), '未命名')
+                name = by_id.get(selected, {}).get('name', '未命名')
                 self.console.print(f"[bold green]✓ 已激活模板: {name}[/bold green]")
     
     def _add_new_template(self):
@@ -4111,28 +4658,24 @@ class MenuUI:
             return
         
         choices = []
+        by_id = {}
         for tpl in templates:
             tpl_id = tpl.get('id', 0)
+            by_id[tpl_id] = tpl
             name = tpl.get('name', '未命名')
             choices.append(questionary.Choice(f"{name} (ID: {tpl_id})", value=tpl_id))
-        choices.append(questionary.Choice("🔙 取消", value=None))
+        choices.append(_CANCEL_CHOICE)
         
         selected_id = questionary.select("选择要编辑的模板:", choices=choices).ask()
         if selected_id is None:
             return
         
-        tpl = next((t for t in templates if t.get('id') == selected_id), None)
+        tpl = by_id.get(selected_id)
         if tpl is None:
             self.console.print("[red]模板不存在[/red]")
             return
         
-        edit_choices = [
-            questionary.Choice("📝 编辑名称", value="name"),
-            questionary.Choice("📄 编辑内容", value="content"),
-            questionary.Choice("🔙 取消", value=None),
-        ]
-        
-        edit_choice = questionary.select("选择要编辑的内容:", choices=edit_choices).ask()
+        edit_choice = questionary.select("选择要编辑的内容:", choices=_EDIT_FIELD_CHOICES).ask()
         
         if edit_choice is None:
             return
@@ -4171,18 +4714,20 @@ class MenuUI:
             return
         
         choices = []
+        by_id = {}
         for tpl in templates:
             tpl_id = tpl.get('id', 0)
+            by_id[tpl_id] = tpl
             name = tpl.get('name', '未命名')
             mark = " [激活]" if tpl_id == active_id else ""
             choices.append(questionary.Choice(f"{name}{mark} (ID: {tpl_id})", value=tpl_id))
-        choices.append(questionary.Choice("🔙 取消", value=None))
+        choices.append(_CANCEL_CHOICE)
         
         selected_id = questionary.select("选择要删除的模板:", choices=choices).ask()
         if selected_id is None:
             return
         
-        tpl_name = next((t.get('name', '未命名') for t in templates if t.get('id') == selected_id), '未命名')
+        tpl_name = by_id.get(selected_id, {}).get('name', '未命名')
         
         if not questionary.confirm(f"确认删除模板 '{tpl_name}'?", default=False).ask():
             self.console.print("[yellow]已取消[/yellow]")
@@ -4193,19 +4738,15 @@ class MenuUI:
     
     def _get_multiline_input(self) -> str | None:
         """获取多行输入"""
-        choices = [
-            questionary.Choice("📋 从剪贴板粘贴", value="clipboard"),
-            questionary.Choice("⌨️  手动输入（输入 END 结束）", value="manual"),
-            questionary.Choice("🔙 取消", value="cancel"),
-        ]
-        
-        method = questionary.select("选择输入方式:", choices=choices).ask()
+        method = questionary.select("选择输入方式:", choices=_INPUT_METHOD_CHOICES).ask()
         
         if method is None or method == "cancel":
             return None
         
         if method == "clipboard":
             try:
+                # 仅剪贴板输入用到，按需导入，避免拖慢程序启动
+                import pyperclip
                 content = pyperclip.paste()
                 if content and content.strip():
                     self.console.print("\n[bold green]已从剪贴板读取内容：[/bold green]")
@@ -4221,47 +4762,76 @@ class MenuUI:
                 return None
         else:
             self.console.print("[cyan]请输入内容（输入单独一行 'END' 结束）:[/cyan]")
-            lines = []
+            if not sys.stdin.isatty():
+                # 管道/重定向输入：直接迭代 stdin，读到 END 行即停，不消费其后的输入
+                lines = []
+                for line in sys.stdin:
+                    line = line.rstrip('\n')
+                    if line.strip() == 'END':
+                        break
+                    lines.append(line)
+                return '\n'.join(lines) if lines else None
+            # 逐行写入同一个缓冲区，不再先攒行列表再整体 join
+            buf = StringIO()
+            line_count = 0
             while True:
                 try:
                     line = input()
                     if line.strip() == 'END':
                         break
-                    lines.append(line)
+                    if line_count:
+                        buf.write('\n')
+                    buf.write(line)
+                    line_count += 1
                 except EOFError:
                     break
-            return '\n'.join(lines) if lines else None
+            return buf.getvalue() if line_count else None
     
     def set_proposal_count(self):
         """设置发送数量"""
         settings = self.config.load_settings()
         self.console.print(f"[cyan]当前设置的发送数量: [bold]{settings['max_proposals']}[/bold][/cyan]")
         
+        def _validate(x: str):
+            x = (x or '').strip()
+            if not x.isdigit():
+                return "请输入数字"
+            if not _POSITIVE_INT_RE.fullmatch(x):
+                return "请输入大于0的数字"
+            return True
+
         new_count = questionary.text(
             "请输入新的发送数量:",
             default=str(settings['max_proposals']),
-            validate=lambda x: x.isdigit() and int(x) > 0 or "请输入大于0的数字"
+            validate=_validate,
         ).ask()
         
         if new_count:
-            settings['max_proposals'] = int(new_count)
-            self.config.save_settings(settings)
-            self.console.print(f"[bold green]✓ 发送数量已设置为: {new_count}[/bold green]")
+            count = int(new_count.strip())
+            if count != settings['max_proposals']:
+                settings['max_proposals'] = count
+                self.config.save_settings(settings)
+            self.console.print(f"[bold green]✓ 发送数量已设置为: {count}[/bold green]")
     
     def view_settings(self):
         """查看当前设置"""
         settings = self.config.load_settings()
         
         table = Table(title="当前设置", border_style="blue")
-        table.add_column("设置项", style="cyan")
+        table.add_column("设置项", style="cyan", no_wrap=True)
         table.add_column("值", style="green")
         
-        table.add_row("发送数量上限", str(settings['max_proposals']))
-        table.add_row("滚动延迟", f"{settings['scroll_delay']} 秒")
-        table.add_row("点击延迟", f"{settings['click_delay']} 秒")
-        table.add_row("弹窗等待", f"{settings['modal_wait']} 秒")
-        table.add_row("Template Term", (settings.get('template_term') or '').strip() or "(未设置)")
-        table.add_row("输入 Partner Groups 标签", "是" if settings.get('input_partner_groups_tag', True) else "否")
+        rows = [
+            ("发送数量上限", str(settings['max_proposals'])),
+            ("滚动延迟", f"{settings['scroll_delay']} 秒"),
+            ("点击延迟", f"{settings['click_delay']} 秒"),
+            ("弹窗等待", f"{settings['modal_wait']} 秒"),
+            ("Template Term", settings['template_term'] or "(未设置)"),
+            ("输入 Partner Groups 标签", "是" if settings.get('input_partner_groups_tag', True) else "否"),
+        ]
+        # 值来自配置文件，用 Text 包装：不做 markup 解析，也避免值里的 [] 被误当成样式标记
+        for name, value in rows:
+            table.add_row(name, Text(value))
         
         self.console.print(table)
         questionary.press_any_key_to_continue("按任意键返回主菜单...").ask()
@@ -4269,18 +4839,12 @@ class MenuUI:
     def set_template_term(self):
         """设置 Template Term 文本"""
         settings = self.config.load_settings()
-        current = (settings.get('template_term') or '').strip()
+        current = settings['template_term']
         
         self.console.print(f"[cyan]当前 Template Term: [bold]{current or '(未设置)'}[/bold][/cyan]")
         
         # 选择设置方式
-        choices = [
-            questionary.Choice("⌨️  手动输入", value="manual"),
-            questionary.Choice("🌐 从浏览器弹窗获取选项列表", value="browser"),
-            questionary.Choice("🔙 取消", value="cancel"),
-        ]
-        
-        method = questionary.select("选择设置方式:", choices=choices).ask()
+        method = questionary.select("选择设置方式:", choices=_TEMPLATE_TERM_METHOD_CHOICES).ask()
         
         if method is None or method == "cancel":
             return
@@ -4319,16 +4883,8 @@ class MenuUI:
 
         selected = questionary.select(
             "请选择 Partner Groups 设置方式:",
-            choices=[
-                questionary.Choice("✅ 网页输入并下拉选择", value="ui"),
-                questionary.Choice("🌐 直连接口（在 settings.json 的 partner_groups.api 填写 Reqable 抓到的 URL/Body）", value="api"),
-                questionary.Choice("🚫 跳过", value="skip"),
-                questionary.Choice("🔙 取消", value=None),
-            ],
-            style=questionary.Style([
-                ('highlighted', 'fg:cyan bold'),
-                ('pointer', 'fg:cyan bold'),
-            ])
+            choices=_PARTNER_GROUPS_MODE_CHOICES,
+            style=_CYAN_MENU_STYLE,
         ).ask()
 
         if selected is None:
@@ -4400,7 +4956,7 @@ class MenuUI:
         # 查找弹窗 iframe
         self.console.print("[cyan]正在查找弹窗...[/cyan]")
         iframe = self.browser.find_element(
-            'css:iframe[data-testid="uicl-modal-iframe-content"]',
+            MODAL_IFRAME_SELECTOR,
             timeout=5
         )
         
@@ -4423,15 +4979,12 @@ class MenuUI:
         for opt in options:
             mark = " ✓" if opt.lower() == current.lower() else ""
             option_choices.append(questionary.Choice(f"{opt}{mark}", value=opt))
-        option_choices.append(questionary.Choice("🔙 取消", value=None))
+        option_choices.append(_CANCEL_CHOICE)
         
         selected = questionary.select(
             "请选择 Template Term:",
             choices=option_choices,
-            style=questionary.Style([
-                ('highlighted', 'fg:cyan bold'),
-                ('pointer', 'fg:cyan bold'),
-            ])
+            style=_CYAN_MENU_STYLE,
         ).ask()
         
         if selected is None:
@@ -4466,11 +5019,13 @@ class ImpactRPA:
     """Impact RPA 主应用类"""
     
     def __init__(self):
-        self.console = Console()
+        # 输出内容均为程序内的可信字符串，关闭自动高亮省去每次 print 的正则扫描
+        self.console = Console(highlight=False)
         self.config = ConfigManager()
         self.template_manager = TemplateManager(self.config)
-        self.browser = BrowserManager(self.console, self.config)
-        self.proposal_sender = ProposalSender(self.browser, self.template_manager, self.console, self.config)
+        settings = self.config.load_settings()
+        self.browser = BrowserManager(self.console, self.config, settings=settings)
+        self.proposal_sender = ProposalSender(self.browser, self.template_manager, self.console, self.config, settings=settings)
         self.menu = MenuUI(
             self.config,
             self.template_manager,
@@ -4484,11 +5039,7 @@ class ImpactRPA:
         # 初始化浏览器
         if not self.browser.init():
             self.console.print("[red]无法连接浏览器，请确保浏览器已打开[/red]")
-            try:
-                from notification_service import NotificationService, NotificationPayload
-                NotificationService().send(NotificationPayload(message="无法连接浏览器"))
-            except Exception:
-                pass
+            self._send_notification("无法连接浏览器")
             return
         
         self._main_loop()
@@ -4523,6 +5074,15 @@ class ImpactRPA:
                 self.console.print("\n[bold cyan]感谢使用，再见！👋[/bold cyan]")
                 break
     
+    def _send_notification(self, message: str) -> None:
+        """桌面通知的唯一入口：按需导入（不把 pydantic/plyer 带进启动路径）。
+        通知在后台线程发送，失败只记日志；依赖缺失也不影响发送流程。"""
+        try:
+            from notification_service import notify
+            notify(message)
+        except Exception as e:
+            logger.warning(f"发送通知失败: {e}")
+
     def _notify_proposal_run(
         self,
         result: SendProposalsResult | None = None,
@@ -4538,11 +5098,7 @@ class ImpactRPA:
             msg = f"发送完成，共发送 {result.clicked_count} 个"
         else:
             return
-        try:
-            from notification_service import NotificationService, NotificationPayload
-            NotificationService().send(NotificationPayload(message=msg))
-        except Exception:
-            pass
+        self._send_notification(msg)
 
     def _start_send_proposals(self):
         """开始发送 Proposal"""
@@ -4566,18 +5122,18 @@ class ImpactRPA:
             self.console.print("[red]起始序号需大于等于 1[/red]")
             return
         
-        self.console.print(
+        header = (
             f"\n[cyan]准备发送 [bold]{max_count}[/bold] 个 Send Proposal（从第 [bold]{start_index}[/bold] 个开始）[/cyan]"
         )
         
+        # 提示语与模板预览合并为一次输出
         template = self.template_manager.get_active_template()
         if not template:
-            self.console.print("[bold yellow]⚠️  警告: 留言模板为空！[/bold yellow]")
+            self.console.print(Group(header, "[bold yellow]⚠️  警告: 留言模板为空！[/bold yellow]"))
             if not questionary.confirm("是否继续?", default=False).ask():
                 return
         else:
-            self.console.print("\n[bold]当前留言模板预览:[/bold]")
-            self.console.print(Panel(template, border_style="dim"))
+            self.console.print(Group(header, "\n[bold]当前留言模板预览:[/bold]", Panel(template, border_style="dim")))
         
         if not questionary.confirm(
             f"确认从第 {start_index} 个开始发送 {max_count} 个 Proposal?",
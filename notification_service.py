@@ -1,6 +1,8 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
 from typing import Optional
+from loguru import logger
 from pydantic import BaseModel
-from plyer import notification
 
 
 class NotificationPayload(BaseModel):
@@ -10,11 +12,59 @@ class NotificationPayload(BaseModel):
     timeout: int = 5
 
 
+def _get_notifier():
+    """按需导入 plyer 的通知对象，推迟到第一次真正发送时再导入（导入时会探测平台）。
+
+    不自行缓存：模块导入由 Python 缓存；导入失败不会被记住，下次发送时会重新尝试。
+    """
+    try:
+        from plyer import notification
+    except ImportError as e:
+        raise RuntimeError(f"桌面通知不可用，未能导入 plyer: {e}") from e
+    return notification
+
+
+@lru_cache(maxsize=1)
+def _get_executor() -> ThreadPoolExecutor:
+    # 所有通知共用一个后台线程，按提交顺序逐条弹出；进程退出时会等队列中的通知发完
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="notify")
+
+
+def _log_failure(future: Future) -> None:
+    error = future.exception()
+    if error is not None:
+        logger.error(f"发送通知失败: {error}")
+
+
 class NotificationService:
-    def send(self, payload: NotificationPayload) -> None:
-        notification.notify(
-            title=payload.title,
-            message=payload.message,
-            app_icon=payload.icon,
-            timeout=payload.timeout,
-        )
+    def send(self, payload: NotificationPayload, wait: bool = False) -> None:
+        """发送桌面通知。plyer 在部分平台会阻塞数十到数百毫秒，默认交给后台线程，失败只记录日志；
+        wait=True 时同步发送，后端不可用等异常直接抛给调用方。"""
+        if wait:
+            self._notify(payload)
+            return
+        _get_executor().submit(self._notify, payload).add_done_callback(_log_failure)
+
+    @staticmethod
+    def _notify(payload: NotificationPayload) -> None:
+        notifier = _get_notifier()
+        try:
+            notifier.notify(
+                title=payload.title,
+                message=payload.message,
+                app_icon=payload.icon,
+                timeout=payload.timeout,
+            )
+        except NotImplementedError as e:
+            # 当前平台没有 plyer 实现时，notify 会退回到只抛 NotImplementedError 的基类
+            raise RuntimeError("桌面通知不可用，当前平台没有可用的通知后端") from e
+        except Exception as e:
+            raise RuntimeError(f"桌面通知不可用: {e}") from e
+
+
+_DEFAULT_SERVICE = NotificationService()
+
+
+def notify(message: str) -> None:
+    """以默认标题发送一条后台通知；失败只记录日志，不影响调用方。"""
+    _DEFAULT_SERVICE.send(NotificationPayload(message=message))
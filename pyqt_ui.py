@@ -382,10 +382,11 @@ class TaskWorker(QThread):
         try:
             template_manager = TemplateManager(self.config)
             log_stream = QtLogStream(self.log_line.emit)
-            console = Console(file=log_stream, force_terminal=False, color_system=None, width=120)
+            console = Console(file=log_stream, force_terminal=False, color_system=None, width=120, highlight=False)
 
-            self.browser = BrowserManager(console, self.config)
-            self.proposal_sender = ProposalSender(self.browser, template_manager, console, self.config)
+            settings = self.config.load_settings()
+            self.browser = BrowserManager(console, self.config, settings=settings)
+            self.proposal_sender = ProposalSender(self.browser, template_manager, console, self.config, settings=settings)
             if self._stop_requested:
                 self.proposal_sender.request_stop()
 
@@ -435,7 +436,7 @@ class MainWindow(QMainWindow):
 
     @staticmethod
     def _build_silent_console() -> Console:
-        return Console(file=io.StringIO(), force_terminal=False, color_system=None, width=120)
+        return Console(file=io.StringIO(), force_terminal=False, color_system=None, width=120, highlight=False)
 
     def init_ui(self) -> None:
         central_widget = QWidget()
@@ -54,7 +54,7 @@ def main() -> int:
 
     console.print(Panel(IMPACT_URL, title="[cyan]目标页面[/cyan]", border_style="cyan"))
 
-    if not browser.navigate(IMPACT_URL):
+    if not browser.navigate(IMPACT_URL, reload=False):
         console.print("[red]导航失败[/red]")
         return 2
 
@@ -4,12 +4,20 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from notification_service import NotificationService, NotificationPayload
 
 
-def main():
-    NotificationService().send(
-        NotificationPayload(message="测试通知：Impact-RPA 桌面通知正常工作")
-    )
+def main() -> int:
+    # 同步发送：没有可用的通知后端时会抛异常，而不是静默跳过
+    try:
+        NotificationService().send(
+            NotificationPayload(message="测试通知：Impact-RPA 桌面通知正常工作"),
+            wait=True,
+        )
+    except Exception as e:
+        print(f"发送测试通知失败: {e}", file=sys.stderr)
+        return 1
+    print("测试通知已发送")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
 
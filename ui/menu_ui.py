@@ -1,5 +1,5 @@
 import questionary
-from legacy_main import MenuUI as LegacyMenuUI
+from legacy_main import MenuUI as LegacyMenuUI, _CANCEL_CHOICE
 from domain.selectors import MODAL_IFRAME_SELECTOR
 
 
@@ -31,7 +31,7 @@ class MenuUI(LegacyMenuUI):
             return
 
         option_choices = [questionary.Choice(f"{opt}{' ✓' if opt.lower() == current.lower() else ''}", value=opt) for opt in options]
-        option_choices.append(questionary.Choice("🔙 取消", value=None))
+        option_choices.append(_CANCEL_CHOICE)
         selected = questionary.select("请选择 Template Term:", choices=option_choices).ask()
 
         if selected is None: